@@ -1,182 +1,156 @@
+import os
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from sklearn.linear_model import LinearRegression
-from sklearn.model_selection import train_test_split
-import numpy as np
-import plotly.graph_objects as go
-
-def dashboard_pertumbuhan_pdrb():
-    # Memuat dan membersihkan data
-    data = pd.read_csv('laju-pertumbuhan-pdrb-aceh.csv', delimiter=';')
-    data.columns = data.columns.str.strip()
-    data = data.apply(lambda x: x.str.strip() if x.dtype == "object" else x)
-
-    # Mengonversi 'tahun' dan 'laju_pertumbuhan_ekonomi' menjadi numerik
-    data['tahun'] = pd.to_numeric(data['tahun'])
-    data['laju_pertumbuhan_ekonomi'] = pd.to_numeric(data['laju_pertumbuhan_ekonomi'])
-
-    # Mengganti nama kolom
-    data = data.rename(columns={
-        'bps_nama_provinsi': 'Provinsi',
-        'laju_pertumbuhan_ekonomi': 'Laju pertumbuhan Ekonomi'
-    })
-
-    # Menghitung perbedaan persentase laju pertumbuhan dengan tahun sebelumnya
-    data['Perbedaan (%)'] = data['Laju pertumbuhan Ekonomi'].diff()
+
+from caching import figure_cache, forecast_cache
+from charts import payload_bytes
+import warmup
+from datasets import ALL_PROVINCES, cache_stats, dataset_version, default_province, load_dataset, provinces, rejected_rows
+from forecast import FORECAST_MODEL
+from metrics import observe_payload, rerun, stage
+from pivots import get_pivot, has_quarters
+from views import (ACCURACY_CAPTION, AGGREGATE_LABELS, accuracy_table, aggregate_figure, all_entities_figure,
+                   growth_backtest_figure, growth_forecast, growth_forecast_figure, selection_figure)
+
+DEBUG = os.environ.get('PDRB_DEBUG') == '1'
+
+# Pemanasan cache: serve.py memulainya saat server mulai; dengan `streamlit run` + PDRB_WARMUP=1 baru pada
+# script run pertama. Berjalan di thread latar, tidak memblokir rerun
+warmup.start_if_enabled()
+
+# Ukuran JSON per grafik pada rerun ini (modul dieksekusi ulang tiap rerun)
+chart_payloads = {}
+
+
+def plotly_chart(key, build):
+    # Figures are cached per (chart, dataset version, selection); build() runs only on a miss
+    def build_and_measure():
+        fig = build()
+        return fig, payload_bytes(fig)
+
+    with stage('figure'):
+        fig, size = figure_cache.get_or_compute(key, build_and_measure)
+    chart_payloads[key[0]] = size
+    observe_payload(key[0], size)
+
+    # Figure serialization and transfer to the browser
+    with stage('plotly_chart'):
+        st.plotly_chart(fig)
+
+
+def normalize_selection(index, selected_fields, top_selection, bottom_selection):
+    # Pilihan dinormalisasi untuk kunci cache grafik: mode top/bottom, atau entitas terurut
+    if top_selection != 'None':
+        n = int(top_selection.split()[0])
+        return index.top(n), ('top', n)
+    if bottom_selection != 'None':
+        n = int(bottom_selection.split()[0])
+        return index.bottom(n), ('bottom', n)
+    selected_fields = sorted(selected_fields)
+    return selected_fields, tuple(selected_fields)
+
+
+def render_accuracy(backtest, names, models, periods_per_year=1, positions=None):
+    # Akurasi backtest rolling-origin (MAE/MAPE) per entitas untuk 1..5 tahun ke depan, dari model pada grafik
+    st.caption(ACCURACY_CAPTION)
+    st.dataframe(accuracy_table(backtest, names, models, periods_per_year, positions))
+
+
+def render_debug_panel(breakdown):
+    with st.sidebar.expander('Debug: waktu per tahap', expanded=True):
+        st.dataframe(pd.DataFrame({
+            'Tahap': list(breakdown),
+            'Waktu (ms)': [round(seconds * 1000, 2) for seconds in breakdown.values()],
+        }), hide_index=True)
+        st.caption(f"Cache dataset: {cache_stats()}")
+        st.caption(f"Cache prediksi: {forecast_cache.stats()}")
+        st.caption(f"Cache grafik: {figure_cache.stats()}")
+        st.caption(f"Ukuran grafik (bytes): {chart_payloads}")
+        if warmup.enabled():
+            st.caption(f"Pemanasan cache: {warmup.progress()}")
+
+def render_rejected(dataset):
+    # Baris CSV yang tidak sesuai skema dilewati (atau nilainya dibaca kosong) saat dimuat; laporannya di sini
+    rejected = rejected_rows(dataset)
+    if len(rejected):
+        st.warning(f"{len(rejected)} baris data tidak sesuai skema; alasannya (dilewati atau dibaca kosong) "
+                   "ada di bawah.")
+        with st.expander('Baris yang ditolak'):
+            st.dataframe(rejected)
+
+
+def select_province(dataset, allow_all=True):
+    # Pemilih provinsi; None berarti semua baris (data bawaan hanya berisi Aceh)
+    with stage('load'):
+        available = provinces(dataset)
+    if len(available) <= 1:
+        return None
+    options = ([ALL_PROVINCES] if allow_all else []) + list(available)
+    default = default_province(dataset, allow_all)
+    selected = st.sidebar.selectbox(
+        'Pilih Provinsi',
+        options,
+        index=options.index(ALL_PROVINCES if default is None else default),
+        format_func=lambda code: 'Semua Provinsi' if code == ALL_PROVINCES else f'{code} - {available[code]}'
+    )
+    return None if selected == ALL_PROVINCES else selected
+
+
+def region_name(dataset, province):
+    # Nama wilayah untuk teks penjelasan: provinsi terpilih, satu-satunya provinsi di data, atau semua provinsi
+    with stage('load'):
+        available = provinces(dataset)
+    if province is not None:
+        return available[province]
+    if len(available) == 1:
+        return next(iter(available.values()))
+    return 'semua provinsi'
+
+
+def dashboard_pertumbuhan_pdrb(province=None):
+    # Memuat data yang sudah dibersihkan (di-cache lintas sesi)
+    with stage('load'):
+        data = load_dataset('laju_pertumbuhan', province)
 
     # Judul Aplikasi Streamlit dan Deskripsi
-    st.title("Laju Pertumbuhan PDRB Aceh dan Prediksi 5 Tahun Ke Depan")
+    st.title(f"Laju Pertumbuhan PDRB {data['Provinsi'].iloc[0]} dan Prediksi 5 Tahun Ke Depan")
     st.markdown("""
     Salah satu indikator penting untuk mengetahui kondisi ekonomi di suatu negara dalam suatu periode tertentu adalah data Produk Domestik Regional Bruto (PDRB), baik atas dasar harga berlaku maupun atas dasar harga konstan. PDRB pada dasarnya merupakan jumlah nilai tambah yang dihasilkan oleh seluruh unit usaha dalam suatu negara tertentu, atau merupakan jumlah nilai barang dan jasa akhir yang dihasilkan oleh seluruh unit ekonomi. PDRB atas dasar harga berlaku menggambarkan nilai tambah barang dan jasa yang dihitung menggunakan harga yang berlaku pada setiap tahun. PDRB atas dasar harga berlaku dapat digunakan untuk melihat pergeseran dan struktur ekonomi.
     """)
 
-    # Grafik 1: Menggunakan Model dengan Data Splitting
-    X = np.array(data['tahun']).reshape(-1, 1)
-    y = data['Laju pertumbuhan Ekonomi']
-
-    # Membagi data menjadi 80% training dan 20% testing
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-    # Membuat model regresi linier menggunakan data training
-    model = LinearRegression()
-    model.fit(X_train, y_train)
-
-    # Prediksi untuk 2 tahun terakhir + 5 tahun ke depan
-    last_two_years = np.arange(data['tahun'].max() - 2, data['tahun'].max() + 1).reshape(-1, 1)
-    future_years = np.arange(data['tahun'].max() + 1, data['tahun'].max() + 6).reshape(-1, 1)
-    all_years = np.concatenate((last_two_years, future_years), axis=0)
-    predictions = model.predict(all_years)
-
-    # Membuat DataFrame untuk data prediksi
-    prediction_df = pd.DataFrame({
-        'tahun': all_years.flatten(),
-        'Laju pertumbuhan Ekonomi': predictions
-    })
-
-    # Grafik Garis untuk Data Historis dan Prediksi (Train-Test Split)
-    st.write("### Grafik 1: Data Historis dan Prediksi dengan Train-Test Split")
-    fig1 = go.Figure()
-
-    # Garis untuk data historis
-    fig1.add_trace(go.Scatter(
-        x=data['tahun'],
-        y=data['Laju pertumbuhan Ekonomi'],
-        mode='lines+markers',
-        name='Data Historis',
-        line=dict(color='blue'),
-        hovertemplate=(
-            'Tahun: %{x}<br>'
-            'Laju Pertumbuhan: %{y:.2f}%'
-        )
-    ))
-
-    # Garis untuk data prediksi (Train-Test Split)
-    fig1.add_trace(go.Scatter(
-        x=prediction_df['tahun'],
-        y=prediction_df['Laju pertumbuhan Ekonomi'],
-        mode='lines+markers',
-        name='Prediksi (Train-Test Split)',
-        line=dict(color='red'),
-        hovertemplate=(
-            'Tahun: %{x}<br>'
-            'Laju Pertumbuhan: %{y:.2f}%'
-        )
-    ))
-
-    fig1.update_layout(
-        title="Grafik 1: Data Historis dan Prediksi (Train-Test Split)",
-        xaxis_title="Tahun",
-        yaxis_title="Laju Pertumbuhan (%)",
-        xaxis=dict(tickformat='.0f')
-    )
+    # Grafik 1: Menguji Model dengan Backtest Rolling-Origin
+    # Backtest dan prediksi (2 tahun terakhir + 5 tahun ke depan), di-cache lintas sesi
+    version = dataset_version('laju_pertumbuhan', province)
+    growth = growth_forecast(data, version)
 
-    st.plotly_chart(fig1)
+    # Grafik Garis untuk Data Historis dan Prediksi Backtest
+    st.write("### Grafik 1: Data Historis dan Prediksi Backtest Rolling-Origin")
+    plotly_chart(('laju_pertumbuhan/backtest', version), lambda: growth_backtest_figure(growth))
+    render_accuracy(growth.backtest, [data['Provinsi'].iloc[0]], [growth.model])
 
     # Penjelasan Setelah Grafik 1
     st.markdown("""
-    Grafik pertama menunjukkan prediksi laju pertumbuhan ekonomi berdasarkan model yang dilatih menggunakan metode *train-test split*. 
-    Metode ini membagi data menjadi 80% data latih dan 20% data uji, sehingga prediksi ini menggambarkan kemampuan model dalam 
-    memprediksi data yang tidak terlihat sebelumnya. Hasil prediksi mencakup dua tahun terakhir dari data historis dan lima tahun ke depan.
+    Grafik pertama menguji model dengan *backtest rolling-origin* (jendela melebar): untuk setiap tahun, model hanya dilatih 
+    dengan data tahun-tahun sebelumnya lalu memprediksi tahun berikutnya, sehingga tidak ada data masa depan yang bocor ke data latih. 
+    Tabel di bawah grafik merangkum kesalahan rata-rata (MAE) dan kesalahan persentase rata-rata (MAPE) untuk prediksi 1 sampai 5 tahun ke depan.
     """)
 
-    # Grafik 2: Prediksi Berdasarkan Data Historis Saja
-    model_full = LinearRegression()
-    model_full.fit(X, y)
-
-    # Membuat data prediksi: 2 tahun terakhir + 5 tahun ke depan
-    last_two_years = np.arange(data['tahun'].max() - 2, data['tahun'].max() + 1).reshape(-1, 1)
-    future_years = np.arange(data['tahun'].max() + 1, data['tahun'].max() + 6).reshape(-1, 1)
-    all_years = np.concatenate((last_two_years, future_years), axis=0)
-
-    # Prediksi berdasarkan model
-    predictions_full = model_full.predict(all_years)
-
-    # Membuat DataFrame untuk data prediksi
-    prediction_df_full = pd.DataFrame({
-        'tahun': all_years.flatten(),
-        'Laju pertumbuhan Ekonomi': predictions_full
-    })
-
-    # Grafik Garis untuk Data Historis dan Prediksi (Data Historis Saja)
+    # Grafik 2: Prediksi Berdasarkan Data Historis Saja (model dengan galat satu langkah ke depan terkecil, interval 95%)
     st.write("### Grafik 2: Data Historis dan Prediksi Berdasarkan Semua Data Historisa")
-    fig2 = go.Figure()
-
-    # Garis untuk data historis
-    fig2.add_trace(go.Scatter(
-        x=data['tahun'],
-        y=data['Laju pertumbuhan Ekonomi'],
-        mode='lines+markers',
-        name='Data Historis',
-        line=dict(color='blue'),
-        hovertemplate=(
-            'Tahun: %{x}<br>'
-            'Laju Pertumbuhan: %{y:.2f}%'
-        )
-    ))
-
-    # Garis untuk data prediksi (Histori Saja)
-    fig2.add_trace(go.Scatter(
-        x=prediction_df_full['tahun'],
-        y=prediction_df_full['Laju pertumbuhan Ekonomi'],
-        mode='lines+markers',
-        name='Prediksi (Histori Saja)',
-        line=dict(color='green'),
-        hovertemplate=(
-            'Tahun: %{x}<br>'
-            'Laju Pertumbuhan: %{y:.2f}%'
-        )
-    ))
-
-    fig2.update_layout(
-        title="Grafik 2: Data Historis dan Prediksi Berdasarkan Semua data Historis",
-        xaxis_title="Tahun",
-        yaxis_title="Laju Pertumbuhan (%)",
-        xaxis=dict(tickformat='.0f')
-    )
-
-    st.plotly_chart(fig2)
+    plotly_chart(('laju_pertumbuhan/full', version, FORECAST_MODEL), lambda: growth_forecast_figure(growth))
 
     # Penjelasan Setelah Grafik 2
     st.markdown("""
     Grafik kedua menunjukkan prediksi laju pertumbuhan ekonomi yang dibuat dengan menggunakan seluruh data historis tanpa pembagian data (tanpa split). 
-    Dengan menggunakan seluruh data untuk melatih model, hasil prediksi ini lebih linier dan mulus karena tidak ada data yang disisihkan untuk pengujian. 
+    Model linear, log-linear, kuadratik dan tren teredam (*damped trend*) dilatih sekaligus, lalu model dengan galat prediksi satu langkah ke depan terkecil (setiap model hanya memprediksi dari tahun-tahun sebelumnya) yang dipakai; nama model tercantum pada legenda dan area berbayang menunjukkan interval prediksi 95%. 
     Prediksi ini juga mencakup dua tahun terakhir dari data historis dan lima tahun ke depan, memberikan gambaran yang konsisten berdasarkan data masa lalu.
     """)
 
-def dashboard_pdrb_per_kapita():
-    # Load the data
-    data = pd.read_csv('produk-domestik-regional-bruto-per-kapita-menurut-kabupaten-kota.csv', delimiter=';')
-
-    # Convert the 'tahun' column to string to avoid automatic formatting with commas
-    data['tahun'] = data['tahun'].astype(str)
-
-    # Select relevant columns and rename them
-    data = data[['bps_nama_kabupaten_kota', 'tahun', 'nilai']].rename(columns={
-        'bps_nama_kabupaten_kota': 'Nama Kabupaten/Kota',
-        'tahun': 'Tahun',
-        'nilai': 'Nilai'
-    })
+def dashboard_pdrb_per_kapita(province=None):
+    # Load the cached entity-by-year pivot (shared across sessions)
+    with stage('load'):
+        index = get_pivot('per_kapita', province=province)
 
     # Title
     st.title('Visualisasi Data PDRB Perkapita')
@@ -185,7 +159,7 @@ def dashboard_pdrb_per_kapita():
     st.sidebar.header('Pilih Nama Kabupaten/Kota')
     selected_fields = st.sidebar.multiselect(
         'Nama Kabupaten/Kota:', 
-        list(data['Nama Kabupaten/Kota'].unique()) + ['Semua Kabupaten/Kota']
+        list(index.entities) + ['Semua Kabupaten/Kota']
     )
     
     # Sidebar for top selection
@@ -202,30 +176,8 @@ def dashboard_pdrb_per_kapita():
         ('None', '3 Terbawah', '5 Terbawah', '10 Terbawah')
     )
 
-    # Initialize variables for data to be displayed
-    combined_data = pd.DataFrame()
-    avg_data = pd.DataFrame()
-
-    # Handle data filtering for "top" and "bottom" selections
-    if top_selection != 'None' or bottom_selection != 'None':
-        latest_year = data['Tahun'].max()
-        latest_year_data = data[data['Tahun'] == latest_year]
-
-        if top_selection != 'None':
-            if top_selection == '3 Teratas':
-                selected_fields = latest_year_data.nlargest(3, 'Nilai')['Nama Kabupaten/Kota'].tolist()
-            elif top_selection == '5 Teratas':
-                selected_fields = latest_year_data.nlargest(5, 'Nilai')['Nama Kabupaten/Kota'].tolist()
-            elif top_selection == '10 Teratas':
-                selected_fields = latest_year_data.nlargest(10, 'Nilai')['Nama Kabupaten/Kota'].tolist()
-
-        elif bottom_selection != 'None':
-            if bottom_selection == '3 Terbawah':
-                selected_fields = latest_year_data.nsmallest(3, 'Nilai')['Nama Kabupaten/Kota'].tolist()
-            elif bottom_selection == '5 Terbawah':
-                selected_fields = latest_year_data.nsmallest(5, 'Nilai')['Nama Kabupaten/Kota'].tolist()
-            elif bottom_selection == '10 Terbawah':
-                selected_fields = latest_year_data.nsmallest(10, 'Nilai')['Nama Kabupaten/Kota'].tolist()
+    # Handle "top" and "bottom" selections with the latest-year rank index
+    selected_fields, selection = normalize_selection(index, selected_fields, top_selection, bottom_selection)
 
     if not selected_fields:
         st.warning("Silakan pilih setidaknya satu Nama Kabupaten/Kota atau opsi top/bottom untuk menampilkan grafik.")
@@ -233,151 +185,69 @@ def dashboard_pdrb_per_kapita():
 
     # Handle data filtering
     if 'Semua Kabupaten/Kota' in selected_fields:
-        # Aggregate data for all fields
-        filtered_data = data.copy()
         selected_fields.remove('Semua Kabupaten/Kota')  # Remove 'Semua Kabupaten/Kota' from the selected list
         
-        # Compute average PDRB per capita for all fields, including all years
-        avg_data = filtered_data.groupby('Tahun').agg({'Nilai': 'mean'}).reset_index()
-        avg_data['Nama Kabupaten/Kota'] = 'Rata-Rata Semua Kabupaten/Kota'
-        
-        # 1. Create combined chart for all Nama Kabupaten/Kota (without predictions)
-        fig_combined = go.Figure()
+        # Per-year aggregate read from the table materialized with the pivot
+        statistic = st.sidebar.radio('Agregat:', list(index.aggregates.columns), format_func=AGGREGATE_LABELS.get)
+        label = AGGREGATE_LABELS[statistic]
 
-        # Plot historical data
-        for kab_kota in filtered_data['Nama Kabupaten/Kota'].unique():
-            kab_kota_data = filtered_data[filtered_data['Nama Kabupaten/Kota'] == kab_kota]
-            fig_combined.add_trace(go.Scatter(
-                x=kab_kota_data['Tahun'], 
-                y=kab_kota_data['Nilai'], 
-                mode='lines+markers',
-                name=f'{kab_kota} (Historis)'
-            ))
-
-        st.plotly_chart(fig_combined)
+        # 1. Create combined chart for all Kabupaten/Kota (without predictions)
+        plotly_chart(('per_kapita/semua', index.name, index.version), lambda: all_entities_figure(index))
 
         # Explanation for the combined chart
-        st.write("""
-        Grafik ini menggabungkan data historis nilai PDRB perkapita untuk semua kabupaten/kota. Data ini memberikan gambaran tentang perkembangan ekonomi di Aceh.
+        st.write(f"""
+        Grafik ini menggabungkan data historis nilai PDRB perkapita untuk semua kabupaten/kota. Data ini memberikan gambaran tentang perkembangan ekonomi di {region_name('per_kapita', province)}.
         """)
 
         # 2. Create chart for average PDRB with predictions
-        future_years = np.arange(int(data['Tahun'].max()) + 1, int(data['Tahun'].max()) + 6)
-        start_year = int(data['Tahun'].max()) - 1
-
-        # Train a linear regression model on the average data
-        model = LinearRegression()
-        X = avg_data['Tahun'].astype(int).values.reshape(-1, 1)
-        y = avg_data['Nilai'].values
-        model.fit(X, y)
-
-        # Predict future values
-        future_predictions = model.predict(future_years.reshape(-1, 1))
-        avg_pred_data = pd.DataFrame({
-            'Nama Kabupaten/Kota': 'Prediksi Semua Kabupaten/Kota',
-            'Tahun': future_years.astype(str),
-            'Nilai': future_predictions
-        })
-
-        # Combine historical and predicted data
-        avg_combined_data = pd.concat([avg_data, avg_pred_data], ignore_index=True)
-
-        fig_avg = px.line(
-            avg_combined_data,
-            x='Tahun',
-            y='Nilai',
-            title='Rata-Rata PDRB Perkapita Semua Kabupaten/Kota',
-            labels={'Tahun': 'Tahun', 'Nilai': 'Nilai (Juta)'},
-            markers=True
-        )
-        st.plotly_chart(fig_avg)
+        # Trend of the aggregate, model chosen by one-step-ahead error (memoized across sessions)
+        projection = index.forecast_aggregate(statistic)
+        plotly_chart(('per_kapita/agregat', index.name, index.version, statistic),
+                     lambda: aggregate_figure(index, statistic, projection))
+        render_accuracy(index.backtest_aggregate(statistic), [f'{label} Semua Kabupaten/Kota'], projection.models,
+                        index.periods_per_year)
 
         # Explanation for the average chart
-        st.write("""
-        Grafik ini menampilkan nilai rata-rata PDRB perkapita dari semua kabupaten/kota untuk setiap tahun, termasuk prediksi untuk lima tahun ke depan. Garis tunggal pada grafik mewakili PDRB rata-rata dan prediksi, memberikan gambaran umum tentang kinerja ekonomi secara keseluruhan di Aceh.
+        st.write(f"""
+        Grafik ini menampilkan nilai rata-rata PDRB perkapita dari semua kabupaten/kota untuk setiap tahun, termasuk prediksi untuk lima tahun ke depan. Garis tunggal pada grafik mewakili PDRB rata-rata dan prediksi, memberikan gambaran umum tentang kinerja ekonomi secara keseluruhan di {region_name('per_kapita', province)}.
         """)
 
     else:
-        # Filter data by selected Nama Kabupaten/Kota
-        filtered_data = data[data['Nama Kabupaten/Kota'].isin(selected_fields)]
-        combined_data = filtered_data
+        # Trends of the selected entities (model per entity by one-step-ahead error), fitted in one batched pass on cache misses
+        projection = index.forecast(selected_fields)
 
         # Create combined chart for selected fields and predictions
-        fig_combined = go.Figure()
-
-        for kab_kota in selected_fields:
-            # Plot historical data
-            kab_kota_data = combined_data[combined_data['Nama Kabupaten/Kota'] == kab_kota]
-            fig_combined.add_trace(go.Scatter(
-                x=kab_kota_data['Tahun'], 
-                y=kab_kota_data['Nilai'], 
-                mode='lines+markers',
-                name=f'{kab_kota} (Historis)'
-            ))
-
-            # Predict future values for selected fields
-            future_years = np.arange(int(data['Tahun'].max()) + 1, int(data['Tahun'].max()) + 6)
-            start_year = int(data['Tahun'].max()) - 1
-            field_prediction_data = pd.DataFrame()
-
-            # Train a linear regression model
-            model = LinearRegression()
-            X = kab_kota_data['Tahun'].astype(int).values.reshape(-1, 1)
-            y = kab_kota_data['Nilai'].values
-            model.fit(X, y)
-
-            # Predict future values
-            future_predictions = model.predict(future_years.reshape(-1, 1))
-            field_pred_data = pd.DataFrame({
-                'Nama Kabupaten/Kota': kab_kota,
-                'Tahun': future_years.astype(str),
-                'Nilai': future_predictions
-            })
-
-            # Combine historical and predicted data
-            combined_data_pred = pd.concat([kab_kota_data[kab_kota_data['Tahun'].astype(int) >= start_year], field_pred_data], ignore_index=True)
-
-            fig_combined.add_trace(go.Scatter(
-                x=combined_data_pred['Tahun'], 
-                y=combined_data_pred['Nilai'], 
-                mode='lines+markers',
-                name=f'{kab_kota} (Prediksi)',
-                line=dict(dash='dash')
-            ))
-
-        st.plotly_chart(fig_combined)
+        plotly_chart(('per_kapita/pilihan', index.name, index.version, selection),
+                     lambda: selection_figure(index, selected_fields, projection))
+        render_accuracy(index.backtest(), selected_fields, projection.models, index.periods_per_year,
+                        index.entities.get_indexer(selected_fields))
 
         # Explanation for the combined chart
         st.write("""
-        Grafik ini menggabungkan data historis dan prediksi nilai PDRB perkapita dari kabupaten/kota yang dipilih. Data prediksi dimulai dari dua tahun sebelum data akhir dan diperpanjang hingga lima tahun ke depan.
+        Grafik ini menggabungkan data historis dan prediksi nilai PDRB perkapita dari kabupaten/kota yang dipilih. Data prediksi dimulai dari dua tahun sebelum data akhir dan diperpanjang hingga lima tahun ke depan; area berbayang menunjukkan interval prediksi 95%.
         """)
 
             
-def dashboard_pdrb_adhb_aceh():
-    # Load the data
-    data = pd.read_csv('pdrb-adhb-aceh-tahun-2010-2023.csv', delimiter=';')
-
-    # Convert the 'tahun' column to string to avoid automatic formatting with commas
-    data['tahun'] = data['tahun'].astype(str)
-
-    # Convert the 'tahun' column to string to avoid automatic formatting with commas
-    data['tahun'] = data['tahun'].astype(str)
-
-    # Select relevant columns and rename them
-    data = data[['lapangan_usaha', 'tahun', 'pdrb']].rename(columns={
-        'lapangan_usaha': 'Lapangan Usaha',
-        'tahun': 'Tahun',
-        'pdrb': 'Nilai PDRB'
-    })
-
+def dashboard_pdrb_adhb_aceh(province=None):
     # Title
     st.title('Visualisasi Data PDRB ADHB')
 
+    # Quarterly (triwulan) files can be viewed per quarter or as annual totals
+    with stage('load'):
+        has_quarterly = has_quarters('adhb', province)
+    quarterly = has_quarterly and st.sidebar.radio(
+        'Periode:', ('Tahunan', 'Triwulanan')
+    ) == 'Triwulanan'
+
+    # Load the cached entity-by-period pivot (shared across sessions)
+    with stage('load'):
+        index = get_pivot('adhb', quarterly=quarterly, province=province)
+
     # Sidebar for selection
     st.sidebar.header('Pilih Lapangan Usaha')
     selected_fields = st.sidebar.multiselect(
         'Lapangan Usaha:', 
-        list(data['Lapangan Usaha'].unique()) + ['Semua Lapangan Usaha']
+        list(index.entities) + ['Semua Lapangan Usaha']
     )
     
     # Sidebar for top selection
@@ -394,30 +264,8 @@ def dashboard_pdrb_adhb_aceh():
         ('None', '3 Terbawah', '5 Terbawah', '10 Terbawah')
     )
 
-    # Initialize variables for data to be displayed
-    combined_data = pd.DataFrame()
-    avg_data = pd.DataFrame()
-
-    # Handle data filtering for "top" and "bottom" selections
-    if top_selection != 'None' or bottom_selection != 'None':
-        latest_year = data['Tahun'].max()
-        latest_year_data = data[data['Tahun'] == latest_year]
-
-        if top_selection != 'None':
-            if top_selection == '3 Teratas':
-                selected_fields = latest_year_data.nlargest(3, 'Nilai PDRB')['Lapangan Usaha'].tolist()
-            elif top_selection == '5 Teratas':
-                selected_fields = latest_year_data.nlargest(5, 'Nilai PDRB')['Lapangan Usaha'].tolist()
-            elif top_selection == '10 Teratas':
-                selected_fields = latest_year_data.nlargest(10, 'Nilai PDRB')['Lapangan Usaha'].tolist()
-
-        elif bottom_selection != 'None':
-            if bottom_selection == '3 Terbawah':
-                selected_fields = latest_year_data.nsmallest(3, 'Nilai PDRB')['Lapangan Usaha'].tolist()
-            elif bottom_selection == '5 Terbawah':
-                selected_fields = latest_year_data.nsmallest(5, 'Nilai PDRB')['Lapangan Usaha'].tolist()
-            elif bottom_selection == '10 Terbawah':
-                selected_fields = latest_year_data.nsmallest(10, 'Nilai PDRB')['Lapangan Usaha'].tolist()
+    # Handle "top" and "bottom" selections with the latest-year rank index
+    selected_fields, selection = normalize_selection(index, selected_fields, top_selection, bottom_selection)
 
     if not selected_fields:
         st.warning("Silakan pilih setidaknya satu Lapangan Usaha atau opsi top/bottom untuk menampilkan grafik.")
@@ -425,136 +273,71 @@ def dashboard_pdrb_adhb_aceh():
 
     # Handle data filtering
     if 'Semua Lapangan Usaha' in selected_fields:
-        # Aggregate data for all fields
-        filtered_data = data.copy()
         selected_fields.remove('Semua Lapangan Usaha')  # Remove 'Semua Lapangan Usaha' from the selected list
         
-        # Compute average PDRB per capita for all fields, including all years
-        avg_data = filtered_data.groupby('Tahun').agg({'Nilai PDRB': 'mean'}).reset_index()
-        avg_data['Lapangan Usaha'] = 'Rata-Rata Semua Lapangan Usaha'
-        
-        # 1. Create combined chart for all Lapangan Usaha (without predictions)
-        fig_combined = go.Figure()
+        # Per-period aggregate read from the table materialized with the pivot
+        statistic = st.sidebar.radio('Agregat:', list(index.aggregates.columns), format_func=AGGREGATE_LABELS.get)
+        label = AGGREGATE_LABELS[statistic]
 
-        # Plot historical data
-        for lapangan_usaha in filtered_data['Lapangan Usaha'].unique():
-            lapangan_usaha_data = filtered_data[filtered_data['Lapangan Usaha'] == lapangan_usaha]
-            fig_combined.add_trace(go.Scatter(
-                x=lapangan_usaha_data['Tahun'], 
-                y=lapangan_usaha_data['Nilai PDRB'], 
-                mode='lines+markers',
-                name=f'{lapangan_usaha} (Historis)'
-            ))
-
-        st.plotly_chart(fig_combined)
+        # 1. Create combined chart for all Lapangan Usaha (without predictions)
+        plotly_chart(('adhb/semua', index.name, index.version), lambda: all_entities_figure(index))
 
         # Explanation for the combined chart
-        st.write("""
-        Grafik ini menggabungkan data historis nilai PDRB ADHB untuk semua lapangan usaha. Data ini memberikan gambaran tentang perkembangan ekonomi di Aceh.
+        st.write(f"""
+        Grafik ini menggabungkan data historis nilai PDRB ADHB untuk semua lapangan usaha. Data ini memberikan gambaran tentang perkembangan ekonomi di {region_name('adhb', province)}.
         """)
 
         # 2. Create chart for average PDRB with predictions
-        future_years = np.arange(int(data['Tahun'].max()) + 1, int(data['Tahun'].max()) + 6)
-        start_year = int(data['Tahun'].max()) - 1
-
-        # Train a linear regression model on the average data
-        model = LinearRegression()
-        X = avg_data['Tahun'].astype(int).values.reshape(-1, 1)
-        y = avg_data['Nilai PDRB'].values
-        model.fit(X, y)
-
-        # Predict future values
-        future_predictions = model.predict(future_years.reshape(-1, 1))
-        avg_pred_data = pd.DataFrame({
-            'Lapangan Usaha': 'Prediksi Semua Lapangan Usaha',
-            'Tahun': future_years.astype(str),
-            'Nilai PDRB': future_predictions
-        })
-
-        # Combine historical and predicted data
-        avg_combined_data = pd.concat([avg_data, avg_pred_data], ignore_index=True)
-
-        fig_avg = px.line(
-            avg_combined_data,
-            x='Tahun',
-            y='Nilai PDRB',
-            title='Rata-Rata PDRB ADHB Semua Lapangan Usaha',
-            labels={'Tahun': 'Tahun', 'Nilai PDRB': 'Nilai (Juta)'},
-            markers=True
-        )
-        st.plotly_chart(fig_avg)
+        # Trend of the aggregate, model chosen by one-step-ahead error (memoized across sessions)
+        projection = index.forecast_aggregate(statistic)
+        plotly_chart(('adhb/agregat', index.name, index.version, statistic),
+                     lambda: aggregate_figure(index, statistic, projection))
+        render_accuracy(index.backtest_aggregate(statistic), [f'{label} Semua Lapangan Usaha'], projection.models,
+                        index.periods_per_year)
 
         # Explanation for the average chart
-        st.write("""
-        Grafik ini menampilkan nilai rata-rata PDRB ADHB dari semua lapangan usaha untuk setiap tahun, termasuk prediksi untuk lima tahun ke depan. Garis tunggal pada grafik mewakili PDRB rata-rata dan prediksi, memberikan gambaran umum tentang kinerja ekonomi secara keseluruhan di Aceh.
+        st.write(f"""
+        Grafik ini menampilkan nilai rata-rata PDRB ADHB dari semua lapangan usaha untuk setiap tahun, termasuk prediksi untuk lima tahun ke depan. Garis tunggal pada grafik mewakili PDRB rata-rata dan prediksi, memberikan gambaran umum tentang kinerja ekonomi secara keseluruhan di {region_name('adhb', province)}.
         """)
 
     else:
-        # Filter data by selected Lapangan Usaha
-        filtered_data = data[data['Lapangan Usaha'].isin(selected_fields)]
-        combined_data = filtered_data
+        # Trends of the selected entities (model per entity by one-step-ahead error), fitted in one batched pass on cache misses
+        projection = index.forecast(selected_fields)
 
         # Create combined chart for selected fields and predictions
-        fig_combined = go.Figure()
-
-        for lapangan_usaha in selected_fields:
-            # Plot historical data
-            lapangan_usaha_data = combined_data[combined_data['Lapangan Usaha'] == lapangan_usaha]
-            fig_combined.add_trace(go.Scatter(
-                x=lapangan_usaha_data['Tahun'], 
-                y=lapangan_usaha_data['Nilai PDRB'], 
-                mode='lines+markers',
-                name=f'{lapangan_usaha} (Historis)'
-            ))
-
-            # Predict future values for selected fields
-            future_years = np.arange(int(data['Tahun'].max()) + 1, int(data['Tahun'].max()) + 6)
-            start_year = int(data['Tahun'].max()) - 1
-            field_prediction_data = pd.DataFrame()
-
-            # Train a linear regression model
-            model = LinearRegression()
-            X = lapangan_usaha_data['Tahun'].astype(int).values.reshape(-1, 1)
-            y = lapangan_usaha_data['Nilai PDRB'].values
-            model.fit(X, y)
-
-            # Predict future values
-            future_predictions = model.predict(future_years.reshape(-1, 1))
-            field_pred_data = pd.DataFrame({
-                'Lapangan Usaha': lapangan_usaha,
-                'Tahun': future_years.astype(str),
-                'Nilai PDRB': future_predictions
-            })
-
-            # Combine historical and predicted data
-            combined_data_pred = pd.concat([lapangan_usaha_data[lapangan_usaha_data['Tahun'].astype(int) >= start_year], field_pred_data], ignore_index=True)
-
-            fig_combined.add_trace(go.Scatter(
-                x=combined_data_pred['Tahun'], 
-                y=combined_data_pred['Nilai PDRB'], 
-                mode='lines+markers',
-                name=f'{lapangan_usaha} (Prediksi)',
-                line=dict(dash='dash')
-            ))
-
-        st.plotly_chart(fig_combined)
+        plotly_chart(('adhb/pilihan', index.name, index.version, selection),
+                     lambda: selection_figure(index, selected_fields, projection))
+        render_accuracy(index.backtest(), selected_fields, projection.models, index.periods_per_year,
+                        index.entities.get_indexer(selected_fields))
 
         # Explanation for the combined chart
         st.write("""
-        Grafik ini menggabungkan data historis dan prediksi nilai PDRB ADHB dari lapangan usaha yang dipilih. Data prediksi dimulai dari dua tahun sebelum data akhir dan diperpanjang hingga lima tahun ke depan.
+        Grafik ini menggabungkan data historis dan prediksi nilai PDRB ADHB dari lapangan usaha yang dipilih. Data prediksi dimulai dari dua tahun sebelum data akhir dan diperpanjang hingga lima tahun ke depan; area berbayang menunjukkan interval prediksi 95%.
         """)
          
 # Sidebar untuk memilih dashboard
 dashboard = st.sidebar.selectbox(
     "Pilih Dashboard",
-    ("Laju Pertumbuhan PDRB", "PDRB Per Kapita Aceh", "PDRB ADHB ACEH")
+    ("Laju Pertumbuhan PDRB", "PDRB Per Kapita", "PDRB ADHB")
 )
 
+# Status pemanasan cache selama masih berjalan
+if warmup.running():
+    status = ', '.join(f'{name}: {state}' for name, state in warmup.progress()['datasets'].items())
+    st.sidebar.caption(f"Pemanasan cache berjalan ({status})")
+
 # Menampilkan dashboard yang dipilih
-if dashboard == "Laju Pertumbuhan PDRB":
-    dashboard_pertumbuhan_pdrb()
-elif dashboard == "PDRB Per Kapita Aceh":
-    dashboard_pdrb_per_kapita()
-elif dashboard == "PDRB ADHB ACEH":
-    dashboard_pdrb_adhb_aceh()
-    
+with rerun(dashboard) as breakdown:
+    if dashboard == "Laju Pertumbuhan PDRB":
+        dashboard_pertumbuhan_pdrb(select_province('laju_pertumbuhan', allow_all=False))
+        render_rejected('laju_pertumbuhan')
+    elif dashboard == "PDRB Per Kapita":
+        dashboard_pdrb_per_kapita(select_province('per_kapita'))
+        render_rejected('per_kapita')
+    elif dashboard == "PDRB ADHB":
+        dashboard_pdrb_adhb_aceh(select_province('adhb'))
+        render_rejected('adhb')
+
+# Panel debug opsional: PDRB_DEBUG=1 atau ?debug=1
+if DEBUG or st.query_params.get('debug') == '1':
+    render_debug_panel(breakdown)
@@ -0,0 +1,32 @@
+"""Command-line options and task chunking shared by the offline batch exports.
+
+``export_forecasts`` and ``export_static`` both load the datasets without a
+Streamlit server and spread their work over a process pool in chunks.
+"""
+import os
+
+import datasets
+
+
+def add_arguments(parser, unit):
+    """``--datasets``, ``--workers``, ``--chunk-size`` (``unit`` per task) and ``--data-dir``."""
+    parser.add_argument('--datasets', nargs='+', default=list(datasets.DATASETS), choices=list(datasets.DATASETS))
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+    parser.add_argument('--chunk-size', type=int, help=f"{unit} per task (default: ~4 tasks per worker)")
+    parser.add_argument('--data-dir', help="directory with the CSVs (default: PDRB_DATA_DIR or the working directory)")
+
+
+def use_data_dir(args):
+    if args.data_dir:
+        # Inherited by the worker processes
+        os.environ[datasets.DATA_DIR_ENV] = args.data_dir
+
+
+def chunk_size(n_items, workers, size=None):
+    """``size``, or about 4 tasks per worker for ``n_items`` items."""
+    return size or max(1, -(-n_items // (workers * 4)))
+
+
+def chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
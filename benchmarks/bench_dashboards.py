@@ -0,0 +1,211 @@
+"""Headless latency and memory benchmark of the three dashboards.
+
+Drives ``app.py`` through Streamlit's ``AppTest`` (no browser, no server) for
+single-entity, top-10 and "Semua" selections, against the bundled CSVs and
+against generated datasets with the same schemas:
+
+    python benchmarks/bench_dashboards.py --output benchmarks/results/baseline.json
+    python benchmarks/bench_dashboards.py --profiles bundled national --compare benchmarks/results/baseline.json
+
+For every scenario it reports the cold latency (process caches cleared, the
+dashboard opened and the selection applied), the median and p95 of warm
+reruns, and the peak Python heap during a separate cold pass.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import datasets  # noqa: E402
+import pivots  # noqa: E402
+import synthetic_data  # noqa: E402
+from caching import figure_cache, forecast_cache  # noqa: E402
+
+APP = os.path.join(ROOT, 'app.py')
+
+# Synthetic dataset profiles: keyword arguments of synthetic_data.generate
+PROFILES = {
+    'national': dict(regions=514, years=50, sectors=17),
+    'national_wide': dict(regions=1000, years=60, sectors=100),
+    'quarterly': dict(regions=514, years=50, sectors=17, quarterly=True),
+}
+
+DASHBOARDS = {
+    'laju_pertumbuhan': 'Laju Pertumbuhan PDRB',
+    'per_kapita': 'PDRB Per Kapita',
+    'adhb': 'PDRB ADHB',
+}
+
+# (scenario name, dashboard key, selection)
+SCENARIOS = [
+    ('laju_pertumbuhan', 'laju_pertumbuhan', None),
+    ('per_kapita/single', 'per_kapita', 'single'),
+    ('per_kapita/top10', 'per_kapita', 'top10'),
+    ('per_kapita/semua', 'per_kapita', 'semua'),
+    ('adhb/single', 'adhb', 'single'),
+    ('adhb/top10', 'adhb', 'top10'),
+    ('adhb/semua', 'adhb', 'semua'),
+]
+
+
+def _widget(elements, label):
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"widget {label!r} not found")
+
+
+def _clear_caches():
+    datasets.clear_cache()
+    pivots.clear_cache()
+    forecast_cache.clear()
+    figure_cache.clear()
+    gc.collect()
+
+
+def _open(dashboard, selection, timeout):
+    """Open ``dashboard`` with ``selection`` applied and return the AppTest."""
+    at = AppTest.from_file(APP, default_timeout=timeout).run()
+    _widget(at.sidebar.selectbox, 'Pilih Dashboard').select(DASHBOARDS[dashboard]).run()
+    # Multi-province files default to Aceh; the first option covers every province
+    if dashboard != 'laju_pertumbuhan' and any(s.label == 'Pilih Provinsi' for s in at.sidebar.selectbox):
+        _widget(at.sidebar.selectbox, 'Pilih Provinsi').select_index(0).run()
+        province = _widget(at.sidebar.selectbox, 'Pilih Provinsi').value
+        if province != datasets.ALL_PROVINCES:
+            raise RuntimeError(f"'Semua Provinsi' not in effect, the dashboard shows province {province}")
+    if selection is None or at.exception:
+        return at
+
+    multiselect = at.sidebar.multiselect[0]
+    if selection == 'single':
+        multiselect.set_value([multiselect.options[0]]).run()
+    elif selection == 'semua':
+        multiselect.set_value([multiselect.options[-1]]).run()
+    elif selection == 'top10':
+        _widget(at.sidebar.radio, 'Pilih Tipe:').set_value('10 Teratas').run()
+    return at
+
+
+def run_scenario(dashboard, selection, repeats, timeout):
+    _clear_caches()
+    start = time.perf_counter()
+    at = _open(dashboard, selection, timeout)
+    cold = time.perf_counter() - start
+    if at.exception:
+        return {'error': at.exception[0].message}
+
+    warm = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        at.run()
+        warm.append(time.perf_counter() - start)
+    warm.sort()
+
+    # Separate cold pass for memory, tracemalloc slows everything down
+    _clear_caches()
+    tracemalloc.start()
+    _open(dashboard, selection, timeout)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'cold_ms': round(cold * 1000, 2),
+        'warm_ms_median': round(statistics.median(warm) * 1000, 2),
+        'warm_ms_p95': round(warm[min(len(warm) - 1, int(len(warm) * 0.95))] * 1000, 2),
+        'peak_heap_mb': round(peak / 2 ** 20, 2),
+        'error': None,
+    }
+
+
+def run(profiles, repeats, timeout, workdir):
+    results = []
+    for profile in profiles:
+        if profile == 'bundled':
+            data_dir = ROOT
+        else:
+            data_dir = os.path.join(workdir, profile)
+            synthetic_data.generate(data_dir, **PROFILES[profile])
+        os.environ[datasets.DATA_DIR_ENV] = data_dir
+
+        for scenario, dashboard, selection in SCENARIOS:
+            result = run_scenario(dashboard, selection, repeats, timeout)
+            result.update(profile=profile, scenario=scenario)
+            results.append(result)
+            print(_format_row(result), flush=True)
+    return results
+
+
+def _format_row(result):
+    if result.get('error'):
+        return f"{result['profile']:<14} {result['scenario']:<20} ERROR {result['error']}"
+    return (f"{result['profile']:<14} {result['scenario']:<20} cold {result['cold_ms']:>9.1f} ms  "
+            f"warm {result['warm_ms_median']:>8.1f} ms (p95 {result['warm_ms_p95']:>8.1f})  "
+            f"heap {result['peak_heap_mb']:>7.1f} MB")
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r['profile'], r['scenario']): r for r in json.load(f)['results']}
+
+    print(f"\nCompared with {baseline_path} (ratio current / baseline):")
+    for result in results:
+        base = baseline.get((result['profile'], result['scenario']))
+        if base is None or base.get('error') or result.get('error'):
+            continue
+        ratios = '  '.join(
+            f"{key} x{result[key] / base[key]:.2f}" if base[key] else f"{key} n/a"
+            for key in ('cold_ms', 'warm_ms_median', 'peak_heap_mb')
+        )
+        print(f"{result['profile']:<14} {result['scenario']:<20} {ratios}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the PDRB dashboards headlessly.")
+    parser.add_argument('--profiles', nargs='+', default=['bundled', 'national', 'quarterly'],
+                        choices=['bundled'] + sorted(PROFILES))
+    parser.add_argument('--repeats', type=int, default=10, help="warm reruns per scenario")
+    parser.add_argument('--timeout', type=float, default=300, help="AppTest timeout per run (seconds)")
+    parser.add_argument('--workdir', help="where synthetic datasets are generated (default: a temp dir)")
+    parser.add_argument('--output', help="write the results as JSON, e.g. a new baseline")
+    parser.add_argument('--compare', help="baseline JSON file to compare against")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run(args.profiles, args.repeats, args.timeout, args.workdir or tmp)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pandas': pd.__version__,
+            'repeats': args.repeats,
+            'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        },
+        'results': results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Cold-start import cost of ``app.py``.
+
+Runs the top-level imports of ``app.py`` in fresh interpreters with
+``python -X importtime`` and reports the median total import time, the peak
+RSS and the heaviest top-level packages:
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --extra sklearn.linear_model sklearn.model_selection plotly.express
+
+``--extra`` also measures the app's imports plus the given modules, e.g. the
+ones ``app.py`` used to import eagerly, to show what the lazy paths save.
+"""
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, 'app.py')
+
+# Printed by the child after the imports: peak RSS in KiB (Linux)
+RSS_PROBE = "import resource; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+
+
+def app_imports(path=APP):
+    """The module-level ``import`` statements of ``path`` as source lines."""
+    with open(path) as f:
+        tree = ast.parse(f.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def measure(statements):
+    """``(total_ms, rss_mb, {top-level package: cumulative ms})`` of one fresh interpreter."""
+    code = '\n'.join(statements + [RSS_PROBE])
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+        env=dict(os.environ, PDRB_METRICS_FILE=''),
+    )
+    total_us = 0
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        total_us += int(self_us)
+        # Top-level entries have no indentation in front of the module name
+        if not name[1:].startswith(' '):
+            package = name.strip().split('.')[0]
+            packages[package] = packages.get(package, 0) + int(cumulative_us) / 1000
+    rss_mb = int(result.stdout.split()[-1]) / 1024
+    return total_us / 1000, rss_mb, packages
+
+
+def report(label, statements, repeats, top):
+    runs = [measure(statements) for _ in range(repeats)]
+    total = statistics.median(run[0] for run in runs)
+    rss = statistics.median(run[1] for run in runs)
+    print(f"{label}: {total:.1f} ms import time, {rss:.1f} MB peak RSS (median of {repeats})")
+    packages = runs[-1][2]
+    for package, ms in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"    {package:<24} {ms:>9.1f} ms")
+    return total, rss
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the cold-start import cost of app.py.")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--top', type=int, default=8, help="heaviest top-level packages to list")
+    parser.add_argument('--extra', nargs='+', default=[], metavar='MODULE',
+                        help="also measure with these modules imported eagerly")
+    args = parser.parse_args(argv)
+
+    statements = app_imports()
+    total, rss = report('app.py', statements, args.repeats, args.top)
+    if args.extra:
+        extra_total, extra_rss = report(
+            'app.py + ' + ' '.join(args.extra),
+            statements + [f'import {module}' for module in args.extra], args.repeats, args.top)
+        print(f"lazy imports save {extra_total - total:.1f} ms and {extra_rss - rss:.1f} MB per worker start")
+
+
+if __name__ == '__main__':
+    main()
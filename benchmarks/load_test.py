@@ -0,0 +1,379 @@
+"""Concurrent-session load test of the dashboards, local and without a network.
+
+Runs N simulated sessions as threads of one process, the way a Streamlit
+worker serves its sessions: each one executes ``app.py`` once per rerun
+with a seeded random sequence of realistic interactions (switching
+dashboard, picking entities, top/bottom N, "Semua" with another aggregate,
+province, annual/triwulan) while sharing the process-wide caches.
+
+    python benchmarks/load_test.py --sessions 1 4 8 16
+    python benchmarks/load_test.py --profiles national --sessions 8 --actions 30 --output load.json
+    python benchmarks/load_test.py --sessions 8 --think 2 --compare load.json
+
+The reruns of different sessions really overlap: instead of ``AppTest``
+(not thread-safe, it swaps a process-wide mock runtime around every run)
+each session gives the script its own stand-in for the ``streamlit``
+module. Its widgets return the values the session picked and its output
+calls do the serialization Streamlit does per rerun (Plotly figure JSON,
+Arrow tables), so the sessions only contend for the GIL and the cache
+locks. Streamlit's own overhead (protobuf deltas, websocket) is not
+included. ``--think`` adds a random pause (exponential, this many seconds
+on average) between the interactions of a session; without it every
+session keeps the worker busy, i.e. the run measures saturation.
+
+For every (profile, session count) it reports the p50/p95/p99 rerun
+latency, the reruns per second over the whole run and the memory the
+sessions added to the process (RSS growth divided by the number of
+sessions). ``--cold`` clears the caches before every run; by default they
+are warmed by a first pass so that runs compare steady-state serving.
+"""
+import argparse
+import builtins
+import contextlib
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import plotly.io as pio
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional, as in Streamlit's own dataframe serialization
+    pa = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bench_dashboards  # noqa: E402
+import synthetic_data  # noqa: E402
+from bench_dashboards import APP, DASHBOARDS, PROFILES, _clear_caches  # noqa: E402
+
+import datasets  # noqa: E402
+
+# app.py is compiled once and executed by every rerun of every session
+with open(APP) as _f:
+    CODE = compile(_f.read(), APP, 'exec')
+
+
+def _rss_mb():
+    """Current resident set size; the peak where /proc is not available."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# Column order of pivots.aggregate_by_year, i.e. the options of the 'Agregat:' radio
+AGGREGATES = ('mean', 'median', 'sum', 'min', 'max', 'weighted_mean')
+
+
+def _nothing(*args, **kwargs):
+    pass
+
+
+class _Sidebar:
+    def __init__(self, session):
+        self.selectbox = session.selectbox
+        self.radio = session.radio
+        self.multiselect = session.multiselect
+        self.expander = session.expander
+        self.header = self.caption = _nothing
+
+
+class Session:
+    """Widget state of one simulated session, standing in for the ``streamlit`` module of ``app.py``.
+
+    Widgets are identified like Streamlit does, by kind, label and options;
+    ``widgets`` lists the ones shown by the last rerun, in order.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.widgets = []
+        self.query_params = {}
+        self.sidebar = _Sidebar(self)
+        self.title = self.markdown = self.write = self.caption = self.warning = _nothing
+        self._builtins = dict(vars(builtins), __import__=self._import)
+
+    def _import(self, name, *args, **kwargs):
+        if name == 'streamlit':
+            return self
+        return builtins.__import__(name, *args, **kwargs)
+
+    def run(self):
+        """One script run of ``app.py`` with the current widget values."""
+        self.widgets = []
+        exec(CODE, {'__name__': '__main__', '__file__': APP, '__builtins__': self._builtins})
+
+    def find(self, kind, label=None):
+        return [key for key in self.widgets if key[0] == kind and label in (None, key[1])]
+
+    def set(self, key, value):
+        self.values[key] = value
+
+    def _widget(self, kind, label, options, default):
+        key = (kind, label, tuple(options))
+        self.widgets.append(key)
+        return self.values.get(key, default)
+
+    def selectbox(self, label, options, index=0, **kwargs):
+        options = list(options)
+        return self._widget('selectbox', label, options, options[index] if options else None)
+
+    def radio(self, label, options, index=0, **kwargs):
+        options = list(options)
+        return self._widget('radio', label, options, options[index] if options else None)
+
+    def multiselect(self, label, options, default=None, **kwargs):
+        return list(self._widget('multiselect', label, list(options), list(default or [])))
+
+    def expander(self, label, expanded=False):
+        return contextlib.nullcontext()
+
+    def plotly_chart(self, fig, **kwargs):
+        pio.to_json(fig, validate=False)
+
+    def dataframe(self, data, **kwargs):
+        if pa is None:
+            return
+        try:
+            pa.Table.from_pandas(data)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Mixed-type columns (e.g. rejected rows) are sent as text, as Streamlit falls back to
+            pa.Table.from_pandas(data.astype(str))
+
+
+# Interactions: each takes (session, rng), sets widget values and returns False when it
+# does not apply to the current page
+def switch_dashboard(session, rng):
+    key, = session.find('selectbox', 'Pilih Dashboard')
+    session.set(key, rng.choice(list(DASHBOARDS.values())))
+
+
+def pick_entities(session, rng):
+    keys = session.find('multiselect')
+    if not keys:
+        return False
+    # The last option is "Semua ..."
+    entities = list(keys[0][2][:-1])
+    session.set(keys[0], rng.sample(entities, min(len(entities), rng.randint(1, 3))))
+    _reset_ranked(session)
+
+
+def pick_semua(session, rng):
+    keys = session.find('multiselect')
+    if not keys:
+        return False
+    session.set(keys[0], [keys[0][2][-1]])
+    _reset_ranked(session)
+
+
+def pick_ranked(session, rng):
+    radios = session.find('radio', 'Pilih Tipe:')
+    if len(radios) != 2:
+        return False
+    top, bottom = radios
+    chosen, other = (top, bottom) if rng.random() < 0.5 else (bottom, top)
+    session.set(chosen, rng.choice(chosen[2][1:]))
+    session.set(other, 'None')
+
+
+def pick_aggregate(session, rng):
+    radios = session.find('radio', 'Agregat:')
+    if not radios:
+        return False
+    session.set(radios[0], rng.choice(radios[0][2]))
+
+
+def pick_province(session, rng):
+    selects = session.find('selectbox', 'Pilih Provinsi')
+    if not selects:
+        return False
+    session.set(selects[0], rng.choice(selects[0][2]))
+
+
+def pick_period(session, rng):
+    radios = session.find('radio', 'Periode:')
+    if not radios:
+        return False
+    session.set(radios[0], rng.choice(radios[0][2]))
+
+
+def _reset_ranked(session):
+    for radio in session.find('radio', 'Pilih Tipe:'):
+        session.set(radio, 'None')
+
+
+# (interaction, weight): mostly selections within a dashboard, now and then another dashboard
+ACTIONS = [
+    (switch_dashboard, 2),
+    (pick_entities, 4),
+    (pick_ranked, 3),
+    (pick_semua, 2),
+    (pick_aggregate, 2),
+    (pick_province, 1),
+    (pick_period, 1),
+]
+
+
+def run_session(seed, actions, think, start, result):
+    """One simulated user: open the app, then ``actions`` interactions; rerun latencies in ``result``."""
+    rng = random.Random(seed)
+    latencies, errors = [], []
+    session = Session()
+    start.wait()
+
+    def timed(interaction):
+        if interaction(session, rng) is False:
+            return
+        begin = time.perf_counter()
+        try:
+            session.run()
+        except Exception as exc:  # a failing rerun is reported, the session goes on
+            errors.append(f'{type(exc).__name__}: {exc}')
+        latencies.append(time.perf_counter() - begin)
+        if think:
+            time.sleep(rng.expovariate(1 / think))
+
+    functions, weights = zip(*ACTIONS)
+    try:
+        timed(lambda session, rng: None)
+        while len(latencies) < actions + 1:
+            timed(rng.choices(functions, weights)[0])
+    except Exception as exc:  # a crashed session is reported, the others go on
+        errors.append(f'{type(exc).__name__}: {exc}')
+    result.update(latencies=latencies, errors=errors)
+
+
+def run_load(sessions, actions, think=0.0, seed=0):
+    """Run ``sessions`` concurrent sessions; returns the latency/throughput/memory summary."""
+    rss_before = _rss_mb()
+    start = threading.Barrier(sessions + 1)
+    results = [{} for _ in range(sessions)]
+    threads = [
+        threading.Thread(target=run_session, args=(seed + i, actions, think, start, results[i]),
+                         name=f'session-{i}', daemon=True)
+        for i in range(sessions)
+    ]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    begin = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - begin
+    rss_after = _rss_mb()
+
+    latencies = np.array([t for r in results for t in r.get('latencies', [])]) * 1000
+    errors = [e for r in results for e in r.get('errors', [])]
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (np.nan,) * 3
+    return {
+        'sessions': sessions,
+        'reruns': int(len(latencies)),
+        'p50_ms': round(float(p50), 2),
+        'p95_ms': round(float(p95), 2),
+        'p99_ms': round(float(p99), 2),
+        'throughput_rps': round(len(latencies) / wall, 2) if wall else None,
+        'wall_s': round(wall, 2),
+        'rss_mb_per_session': round(max(rss_after - rss_before, 0.0) / sessions, 2),
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+    }
+
+
+def run(profiles, session_counts, actions, think, workdir, cold):
+    results = []
+    for profile in profiles:
+        if profile == 'bundled':
+            data_dir = bench_dashboards.ROOT
+        else:
+            data_dir = os.path.join(workdir, profile)
+            synthetic_data.generate(data_dir, **PROFILES[profile])
+        os.environ[datasets.DATA_DIR_ENV] = data_dir
+
+        _clear_caches()
+        if not cold:
+            # Same interactions as the measured runs, so they start from warm caches
+            run_load(max(session_counts), actions)
+        for sessions in session_counts:
+            if cold:
+                _clear_caches()
+            result = run_load(sessions, actions, think)
+            result.update(profile=profile)
+            results.append(result)
+            print(_format_row(result), flush=True)
+    return results
+
+
+def _format_row(result):
+    row = (f"{result['profile']:<14} {result['sessions']:>3} sessions  "
+           f"p50 {result['p50_ms']:>8.1f} ms  p95 {result['p95_ms']:>8.1f} ms  p99 {result['p99_ms']:>8.1f} ms  "
+           f"{result['throughput_rps']:>7.2f} reruns/s  {result['rss_mb_per_session']:>7.2f} MB/session")
+    if result['errors']:
+        row += f"  {result['errors']} errors ({result['first_error']})"
+    return row
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r['profile'], r['sessions']): r for r in json.load(f)['results']}
+
+    print(f"\nCompared with {baseline_path} (ratio current / baseline):")
+    for result in results:
+        base = baseline.get((result['profile'], result['sessions']))
+        if base is None:
+            continue
+        ratios = '  '.join(
+            f"{key} x{result[key] / base[key]:.2f}" if base[key] else f"{key} n/a"
+            for key in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps', 'rss_mb_per_session')
+        )
+        print(f"{result['profile']:<14} {result['sessions']:>3} sessions  {ratios}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the PDRB dashboards with concurrent sessions.")
+    parser.add_argument('--profiles', nargs='+', default=['bundled'], choices=['bundled'] + sorted(PROFILES))
+    parser.add_argument('--sessions', nargs='+', type=int, default=[1, 4, 8], help="concurrent session counts")
+    parser.add_argument('--actions', type=int, default=20, help="interactions per session")
+    parser.add_argument('--think', type=float, default=0.0,
+                        help="mean pause between interactions of a session (seconds, default: none)")
+    parser.add_argument('--cold', action='store_true', help="clear the process caches before every run")
+    parser.add_argument('--workdir', help="where synthetic datasets are generated (default: a temp dir)")
+    parser.add_argument('--output', help="write the results as JSON")
+    parser.add_argument('--compare', help="results JSON file to compare against")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run(args.profiles, args.sessions, args.actions, args.think,
+                      args.workdir or tmp, args.cold)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'actions': args.actions,
+            'think_s': args.think,
+            'cold': args.cold,
+        },
+        'results': results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Generate scaled-up synthetic PDRB datasets with the bundled CSV schemas.
+
+    python benchmarks/synthetic_data.py out/national --regions 514 --years 50
+    python benchmarks/synthetic_data.py out/quarterly --years 50 --quarterly
+
+The three files keep the bundled file names, delimiter and columns, so the app
+reads them unchanged with ``PDRB_DATA_DIR=out/national``.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# File names the app expects inside PDRB_DATA_DIR
+LAJU_FILE = 'laju-pertumbuhan-pdrb-aceh.csv'
+PER_KAPITA_FILE = 'produk-domestik-regional-bruto-per-kapita-menurut-kabupaten-kota.csv'
+ADHB_FILE = 'pdrb-adhb-aceh-tahun-2010-2023.csv'
+
+SECTORS = [
+    ('A', 'Pertanian. Kehutanan. dan Perikanan'),
+    ('B', 'Pertambangan dan Penggalian'),
+    ('C', 'Industri Pengolahan'),
+    ('D', 'Pengadaan Listrik dan Gas'),
+    ('E', 'Pengadaan Air. Pengelolaan Sampah. Limbah dan Daur Ulang'),
+    ('F', 'Konstruksi'),
+    ('G', 'Perdagangan Besar dan Eceran; Reparasi Mobil dan Sepeda Motor'),
+    ('H', 'Transportasi dan Pergudangan'),
+    ('I', 'Penyediaan Akomodasi dan Makan Minum'),
+    ('J', 'Informasi dan Komunikasi'),
+    ('K', 'Jasa Keuangan dan Asuransi'),
+    ('L', 'Real Estat'),
+    ('M. N', 'Jasa Perusahaan'),
+    ('O', 'Administrasi Pemerintahan. Pertahanan. dan Jaminan Sosial Wajib'),
+    ('P', 'Jasa Pendidikan'),
+    ('Q', 'Jasa Kesehatan dan Kegiatan Sosial'),
+    ('R. S. T. U', 'Jasa Lainnya'),
+]
+
+
+def _growth_paths(rng, n_entities, n_periods, start_low, start_high, periods_per_year=1):
+    """Noisy exponential growth paths shaped ``(n_entities, n_periods)``."""
+    start = rng.uniform(start_low, start_high, size=(n_entities, 1))
+    growth = rng.normal(0.05, 0.02, size=(n_entities, 1)) / periods_per_year
+    shocks = rng.normal(0.0, 0.02, size=(n_entities, n_periods))
+    return start * np.exp(np.cumsum(growth + shocks, axis=1))
+
+
+def provinces(n_provinces):
+    codes = 11 + np.arange(n_provinces)
+    return [(int(code), 'Aceh' if code == 11 else f'Provinsi Sintetis {code}') for code in codes]
+
+
+def make_laju_pertumbuhan(rng, years):
+    return pd.DataFrame({
+        'bps_kode': 11,
+        'bps_nama_provinsi': 'Aceh ',
+        'tahun': years,
+        'laju_pertumbuhan_ekonomi': rng.normal(4.0, 1.5, size=len(years)).round(2),
+        'satuan': 'Persen',
+    })
+
+
+def make_per_kapita(rng, years, n_regions, n_provinces):
+    province_list = provinces(n_provinces)
+    region_province = [province_list[i * n_provinces // n_regions] for i in range(n_regions)]
+    values = _growth_paths(rng, n_regions, len(years), 8, 120).round(2)
+
+    rows = len(years) * n_regions
+    return pd.DataFrame({
+        'bps_kode_provinsi': np.tile([code for code, _ in region_province], len(years)),
+        'bps_nama_provinsi': np.tile([name for _, name in region_province], len(years)),
+        'bps_kode_kabupaten_kota': np.tile(
+            [code * 100 + i + 1 for i, (code, _) in enumerate(region_province)], len(years)),
+        'bps_nama_kabupaten_kota': np.tile(
+            [f'Kabupaten Sintetis {i + 1:04d}' for i in range(n_regions)], len(years)),
+        'tahun': np.repeat(years, n_regions),
+        'nilai': values.T.ravel(),
+        'satuan': np.full(rows, 'Juta Rupiah'),
+    })
+
+
+def make_adhb(rng, years, n_sectors, n_provinces, quarterly):
+    sectors = SECTORS[:n_sectors] + [
+        (f'Z{i:03d}', f'Lapangan Usaha Sintetis {i:04d}') for i in range(len(SECTORS) + 1, n_sectors + 1)
+    ]
+    quarters = [1, 2, 3, 4] if quarterly else [None]
+    periods = [(year, quarter) for year in years for quarter in quarters]
+
+    frames = []
+    for code, name in provinces(n_provinces):
+        values = _growth_paths(rng, len(sectors), len(periods), 100, 30000, len(quarters))
+        frames.append(pd.DataFrame({
+            'bps_kode_provinsi': code,
+            'bps_nama_provinsi': name,
+            'tahun': np.repeat([year for year, _ in periods], len(sectors)),
+            'triwulan': np.repeat([quarter for _, quarter in periods], len(sectors)),
+            'kode_lapangan_usaha': np.tile([c for c, _ in sectors], len(periods)),
+            'lapangan_usaha': np.tile([n for _, n in sectors], len(periods)),
+            'pdrb': (values.T.ravel() / len(quarters)).round(2),
+            'satuan': 'Miliar Rupiah',
+        }))
+    data = pd.concat(frames, ignore_index=True)
+    data['triwulan'] = data['triwulan'].astype('Int8')
+    return data
+
+
+def generate(out_dir, regions=514, years=50, start_year=1974, sectors=17, provinces=1,
+             kapita_provinces=38, quarterly=False, seed=0):
+    """Write the three synthetic CSVs into ``out_dir`` and return their paths."""
+    rng = np.random.default_rng(seed)
+    year_range = np.arange(start_year, start_year + years)
+    os.makedirs(out_dir, exist_ok=True)
+
+    outputs = {
+        LAJU_FILE: make_laju_pertumbuhan(rng, year_range),
+        PER_KAPITA_FILE: make_per_kapita(rng, year_range, regions, kapita_provinces),
+        ADHB_FILE: make_adhb(rng, year_range, sectors, provinces, quarterly),
+    }
+    paths = []
+    for file_name, data in outputs.items():
+        path = os.path.join(out_dir, file_name)
+        data.to_csv(path, sep=';', index=False)
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic PDRB CSVs with the app's schemas.")
+    parser.add_argument('out_dir')
+    parser.add_argument('--regions', type=int, default=514, help="kabupaten/kota in the per-capita file")
+    parser.add_argument('--years', type=int, default=50)
+    parser.add_argument('--start-year', type=int, default=1974)
+    parser.add_argument('--sectors', type=int, default=len(SECTORS), help="lapangan usaha in the ADHB file")
+    parser.add_argument('--provinces', type=int, default=1, help="provinces in the ADHB file")
+    parser.add_argument('--quarterly', action='store_true', help="emit triwulan 1-4 rows in the ADHB file")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for path in generate(args.out_dir, args.regions, args.years, args.start_year, args.sectors,
+                         args.provinces, quarterly=args.quarterly, seed=args.seed):
+        print(f"{path}: {os.path.getsize(path)} bytes")
+
+
+if __name__ == '__main__':
+    main()
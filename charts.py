@@ -0,0 +1,124 @@
+"""Plotly trace builders shared by the dashboards.
+
+Above ``HIGH_CARDINALITY_THRESHOLD`` entities, one SVG ``Scatter`` per entity
+makes the figure JSON and the browser render time explode, so the "Semua"
+charts switch to a single WebGL trace whose entities are separated by ``NaN``
+gaps. Hover still names the entity through ``customdata``.
+
+Figures are serialized with orjson when it is installed (several times faster
+than the standard library encoder on large numeric traces).
+"""
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+try:
+    import orjson  # noqa: F401
+except ImportError:
+    pass
+else:
+    pio.json.config.default_engine = 'orjson'
+
+HIGH_CARDINALITY_THRESHOLD = int(os.environ.get('PDRB_HIGH_CARDINALITY_THRESHOLD', 50))
+# Server-side downsampling of the consolidated trace kicks in when an entity has more points than this
+MAX_POINTS_PER_ENTITY = int(os.environ.get('PDRB_MAX_POINTS_PER_ENTITY', 120))
+
+
+def period_axis(periods_per_year=1):
+    """x axis layout for integer years or ``year + (triwulan - 1) / 4`` periods."""
+    if periods_per_year == 1:
+        return dict(tickformat='.0f')
+    # One tick per year; hover keeps the quarter (.00, .25, .50, .75)
+    return dict(tickformat='.0f', dtick=1, hoverformat='.2f')
+
+
+def payload_bytes(fig):
+    """Size of the JSON spec ``st.plotly_chart`` sends to the browser for ``fig``."""
+    return len(pio.to_json(fig, validate=False))
+
+
+def add_interval_band(fig, x, lower, upper, legendgroup=None, name='Interval Prediksi 95%',
+                      color='rgba(99, 110, 250, 0.15)'):
+    """Shade the prediction interval between ``lower`` and ``upper`` over the periods ``x``."""
+    x = np.asarray(x, dtype=float)
+    fig.add_trace(go.Scatter(
+        x=np.concatenate([x, x[::-1]]),
+        y=np.concatenate([np.asarray(upper, dtype=float), np.asarray(lower, dtype=float)[::-1]]),
+        mode='lines',
+        fill='toself',
+        fillcolor=color,
+        line=dict(width=0),
+        hoverinfo='skip',
+        name=name,
+        legendgroup=legendgroup,
+        # The band follows its prediction line in the legend
+        showlegend=legendgroup is None,
+    ))
+    return fig
+
+
+def downsample_columns(wide, max_points=MAX_POINTS_PER_ENTITY):
+    """Average the period columns over buckets of whole years when the x axis is dense.
+
+    Quarters are averaged per year (or per several years) instead of keeping
+    every n-th column, which would always land on the same quarters. Each
+    bucket is placed at the mean of its periods; buckets end at the last year.
+    """
+    n = wide.shape[1]
+    if max_points is None or n <= max_points:
+        return wide
+    wide = wide.sort_index(axis=1)
+    x = wide.columns.to_numpy(dtype=float)
+    years, position = np.unique(np.floor(x), return_inverse=True)
+    years_per_bucket = math.ceil(len(years) / max_points)
+    bucket = -((len(years) - 1 - position) // years_per_bucket)
+    starts = np.flatnonzero(np.diff(bucket, prepend=bucket[0] - 1))
+
+    values = wide.to_numpy(dtype=float)
+    observed = ~np.isnan(values)
+    sums = np.add.reduceat(np.where(observed, values, 0.0), starts, axis=1)
+    counts = np.add.reduceat(observed, starts, axis=1)
+    with np.errstate(invalid='ignore'):
+        means = sums / counts
+    periods = np.add.reduceat(x, starts) / np.diff(np.append(starts, n))
+    return pd.DataFrame(means, index=wide.index, columns=periods)
+
+
+def add_entity_traces(fig, wide, suffix='(Historis)', threshold=HIGH_CARDINALITY_THRESHOLD,
+                      max_points=MAX_POINTS_PER_ENTITY):
+    """Add one line per row of the entity-by-period frame ``wide`` to ``fig``."""
+    if len(wide) <= threshold:
+        for entity, row in wide.iterrows():
+            row = row.dropna()
+            fig.add_trace(go.Scatter(
+                x=row.index,
+                y=row.values,
+                mode='lines+markers',
+                name=f'{entity} {suffix}'
+            ))
+        return fig
+
+    # One consolidated WebGL trace; the NaN column splits the entities apart
+    wide = downsample_columns(wide, max_points)
+    n_entities, n_periods = wide.shape
+    x = np.tile(np.append(wide.columns.to_numpy(dtype=float), np.nan), n_entities)
+    y = np.column_stack([wide.to_numpy(dtype=float), np.full(n_entities, np.nan)]).ravel()
+    entities = np.repeat(wide.index.to_numpy(dtype=object), n_periods + 1)
+    codes = np.repeat(np.arange(n_entities), n_periods + 1)
+
+    fig.add_trace(go.Scattergl(
+        x=x,
+        y=y,
+        customdata=entities,
+        mode='lines+markers',
+        name=f'Semua ({n_entities}) {suffix}',
+        connectgaps=False,
+        line=dict(width=1, color='rgba(99, 110, 250, 0.35)'),
+        marker=dict(size=4, color=codes, colorscale='Turbo'),
+        hovertemplate='%{customdata}<br>Tahun: %{x}<br>Nilai: %{y:,.2f}<extra></extra>'
+    ))
+    return fig
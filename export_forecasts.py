@@ -0,0 +1,93 @@
+"""Export the 5-year projections of every entity of every province of every dataset.
+
+    python export_forecasts.py forecasts.csv
+    python export_forecasts.py forecasts.parquet --workers 8 --horizon 5
+
+Runs without a Streamlit server. It reuses the app's dataset loading, pivots
+and batched model fits (the same per-entity one-step-ahead error choice as
+the dashboards, or ``--model``), splits the entities of each province into
+chunks fitted across a process pool and writes one long table: a row per
+dataset, province, entity and projected year with the 95% prediction interval, the chosen model and its parameters
+(``forecast.PARAMETERS``; empty for parameters the model does not have).
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import datasets
+from batch import add_arguments, chunk_size, chunks, use_data_dir
+from forecast import FORECAST_HORIZON, FORECAST_MODEL, MODELS, fit_models
+from pivots import get_pivot
+
+
+def forecast_chunk(name, province, entities, horizon, model=FORECAST_MODEL):
+    """Fit ``entities`` of province ``province`` of dataset ``name`` and return their projections as rows."""
+    index = get_pivot(name, province=province)  # loaded once per worker process, then cached
+    values = index.matrix(entities)
+    future_years = index.future_years(horizon)
+    fit = fit_models(index.years, values, future_years, model)
+    columns = np.arange(len(entities))
+
+    n_entities = len(entities)
+    return pd.DataFrame({
+        'dataset': name,
+        'dataset_version': index.version,
+        'kode_provinsi': province,
+        'entity': np.tile(np.asarray(entities, dtype=object), horizon),
+        'model': np.tile(np.asarray(fit.models, dtype=object), horizon),
+        **{parameter: np.tile(value, horizon) for parameter, value in fit.parameters().items()},
+        'mse_satu_langkah': np.tile(fit.one_step_mse[fit.choice, columns], horizon),
+        'n_obs': np.tile((~np.isnan(values)).sum(axis=0), horizon),
+        'last_year': index.last_year,
+        'tahun': np.repeat(future_years, n_entities),
+        'prediksi': fit.best(fit.predictions).ravel(),
+        'batas_bawah': fit.best(fit.lower).ravel(),
+        'batas_atas': fit.best(fit.upper).ravel(),
+    })
+
+
+def export(names, horizon, workers, size=None, model=FORECAST_MODEL):
+    tasks = []
+    for name in names:
+        # Entities are only unique within a province (kabupaten/kota codes, lapangan usaha names)
+        indexes = {province: get_pivot(name, province=province) for province in datasets.provinces(name)}
+        n_entities = sum(len(index.entities) for index in indexes.values())
+        size = chunk_size(n_entities, workers, size)
+        for province, index in indexes.items():
+            tasks.extend((name, province, chunk) for chunk in chunks(list(index.entities), size))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(forecast_chunk, name, province, chunk, horizon, model)
+                   for name, province, chunk in tasks]
+        frames = [future.result() for future in futures]
+
+    result = pd.concat(frames, ignore_index=True)
+    return result.sort_values(['dataset', 'kode_provinsi', 'entity', 'tahun'], kind='stable', ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export batch forecasts for every PDRB entity.")
+    parser.add_argument('output', help="output file; .parquet writes Parquet, anything else CSV")
+    add_arguments(parser, 'entities')
+    parser.add_argument('--horizon', type=int, default=FORECAST_HORIZON)
+    parser.add_argument('--model', default=FORECAST_MODEL, choices=('auto',) + MODELS,
+                        help="forecast model; 'auto' picks one per entity by one-step-ahead error like the dashboards")
+    args = parser.parse_args(argv)
+    use_data_dir(args)
+
+    start = time.perf_counter()
+    result = export(args.datasets, args.horizon, args.workers, args.chunk_size, args.model)
+    if args.output.endswith('.parquet'):
+        result.to_parquet(args.output, index=False)
+    else:
+        result.to_csv(args.output, sep=';', index=False)
+    n_entities = len(result.drop_duplicates(['dataset', 'kode_provinsi', 'entity']))
+    print(f"Wrote {len(result)} rows for {n_entities} entities to {args.output} "
+          f"in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,282 @@
+"""Pre-render the dashboard views as static HTML and JSON files.
+
+    python export_static.py site/
+    python export_static.py site/ --workers 8 --datasets per_kapita adhb --all-provinces
+
+Runs without a Streamlit server. The views most visitors stop at are
+rendered ahead of time with the app's own dataset loading, pivots, forecasts
+and figure builders (``views``): every "Semua" aggregate, every single
+entity and the top/bottom 3/5/10, per dataset (annual and triwulan) and
+province. The views are split into chunks rendered across a process pool.
+
+Each view is written as ``<dataset>/<view>.html``, a standalone page with its
+charts and backtest accuracy table, and ``<dataset>/<view>.json`` with the
+Plotly figure specs and the table. ``index.html`` and ``manifest.json`` list
+every view, so a static file server can serve them with no computation per
+request. Plotly.js is written once next to them, or loaded from the URL
+given with ``--plotlyjs``.
+"""
+import argparse
+import html
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import plotly.io as pio
+
+from batch import add_arguments, chunk_size, chunks, use_data_dir
+from caching import figure_cache
+from datasets import dataset_version, default_province, load_dataset, provinces
+from forecast import FORECAST_MODEL
+from pivots import get_pivot, has_quarters
+from views import (ACCURACY_CAPTION, AGGREGATE_LABELS, SUBJECTS, accuracy_table, aggregate_figure,
+                   all_entities_figure, growth_backtest_figure, growth_forecast, growth_forecast_figure,
+                   selection_figure)
+from warmup import TOP_BOTTOM
+
+PLOTLY_JS = 'plotly.min.js'
+DASHBOARD_TITLES = {
+    'laju_pertumbuhan': 'Laju Pertumbuhan PDRB',
+    'per_kapita': 'Visualisasi Data PDRB Perkapita',
+    'adhb': 'Visualisasi Data PDRB ADHB',
+}
+
+PAGE = """<!DOCTYPE html>
+<html lang="id">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="{plotlyjs}"></script>
+</head>
+<body>
+<p><a href="{home}">Semua tampilan</a></p>
+<h1>{title}</h1>
+{body}
+</body>
+</html>
+"""
+
+
+def slug(text):
+    return re.sub(r'[^a-z0-9]+', '-', str(text).lower()).strip('-')
+
+
+def target_dir(name, province, quarterly):
+    """Directory of the views of one dataset, province and period, relative to the output."""
+    parts = [name]
+    if province is not None:
+        parts.append(f'provinsi-{province}')
+    if quarterly:
+        parts.append('triwulan')
+    return '/'.join(parts)
+
+
+def targets(names, all_provinces=False):
+    """``(dataset, province, quarterly)`` of every pivot to render, default provinces only unless asked."""
+    for name in names:
+        allow_all = name != 'laju_pertumbuhan'
+        if all_provinces and len(provinces(name)) > 1:
+            codes = ([None] if allow_all else []) + list(provinces(name))
+        else:
+            codes = [default_province(name, allow_all)]
+        for province in codes:
+            quarterly_options = allow_all and has_quarters(name, province)
+            for quarterly in (False, True) if quarterly_options else (False,):
+                yield name, province, quarterly
+
+
+def view_specs(name, province, quarterly):
+    """``(file name, kind, argument)`` of every view of one target."""
+    if name == 'laju_pertumbuhan':
+        return [('index', 'laju', None)]
+    index = get_pivot(name, quarterly=quarterly, province=province)
+    specs = [(f'semua-{statistic}', 'semua', statistic) for statistic in index.aggregates.columns]
+    specs += [(f'{kind}-{n}', kind, n) for kind in ('top', 'bottom') for n in TOP_BOTTOM]
+    used = {filename for filename, _, _ in specs}
+    for position, entity in enumerate(index.entities):
+        # Entity names may only differ by punctuation or case
+        filename = f'entitas-{slug(entity) or position}'
+        if filename in used:
+            filename = f'{filename}-{position}'
+        used.add(filename)
+        specs.append((filename, 'entitas', entity))
+    return specs
+
+
+def _figure(key, build):
+    # Charts shared by several views (the "Semua" history) are built once per worker
+    return figure_cache.get_or_compute(key, build)
+
+
+def render_growth(province):
+    """Title, ``[(heading, figure)]`` and ``[(caption, table)]`` of the laju pertumbuhan view."""
+    data = load_dataset('laju_pertumbuhan', province)
+    version = dataset_version('laju_pertumbuhan', province)
+    growth = growth_forecast(data, version)
+    title = f"Laju Pertumbuhan PDRB {data['Provinsi'].iloc[0]} dan Prediksi 5 Tahun Ke Depan"
+    figures = [
+        ('Grafik 1: Data Historis dan Prediksi Backtest Rolling-Origin', growth_backtest_figure(growth)),
+        ('Grafik 2: Data Historis dan Prediksi Berdasarkan Semua Data Historis', growth_forecast_figure(growth)),
+    ]
+    table = accuracy_table(growth.backtest, [data['Provinsi'].iloc[0]], [growth.model])
+    return title, figures, [(ACCURACY_CAPTION, table)]
+
+
+def render_view(index, kind, argument):
+    """Title, ``[(heading, figure)]`` and ``[(caption, table)]`` of one view of the pivot ``index``."""
+    subject, entities = SUBJECTS[index.dataset]
+    if kind == 'semua':
+        label = AGGREGATE_LABELS[argument]
+        projection = index.forecast_aggregate(argument)
+        figures = [
+            (f'Semua {entities} (Historis)',
+             _figure((f'{index.name}/semua', index.name, index.version), lambda: all_entities_figure(index))),
+            (f'{label} Semua {entities}', aggregate_figure(index, argument, projection)),
+        ]
+        table = accuracy_table(index.backtest_aggregate(argument), [f'{label} Semua {entities}'],
+                               projection.models, index.periods_per_year)
+        return f'{label} Semua {entities}', figures, [(ACCURACY_CAPTION, table)]
+
+    if kind == 'entitas':
+        selected, title = [argument], argument
+    else:
+        selected = index.top(argument) if kind == 'top' else index.bottom(argument)
+        title = f"{argument} {'Teratas' if kind == 'top' else 'Terbawah'}"
+    projection = index.forecast(selected)
+    table = accuracy_table(index.backtest(), selected, projection.models, index.periods_per_year,
+                           index.entities.get_indexer(selected))
+    return title, [(f'{subject}: {title}', selection_figure(index, selected, projection))], [(ACCURACY_CAPTION, table)]
+
+
+def _write(path, text):
+    # Written next to the target and renamed, so a server never serves half a file
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+    return len(text.encode('utf-8'))
+
+
+def write_view(output, directory, filename, title, figures, tables, meta, plotlyjs):
+    """Write the HTML page and the JSON spec of one view; returns its manifest entry."""
+    folder = os.path.join(output, directory)
+    home = os.path.relpath(os.path.join(output, 'index.html'), folder)
+    script = plotlyjs if plotlyjs != 'directory' else os.path.relpath(os.path.join(output, PLOTLY_JS), folder)
+
+    body = []
+    for i, (heading, fig) in enumerate(figures):
+        body.append(f'<h3>{html.escape(heading)}</h3>')
+        body.append(pio.to_html(fig, full_html=False, include_plotlyjs=False, div_id=f'grafik-{i + 1}',
+                                default_height=450))
+    for caption, table in tables:
+        body.append(f'<p>{html.escape(caption)}</p>')
+        body.append(table.to_html(na_rep='-'))
+    page = PAGE.format(title=html.escape(title), plotlyjs=script, home=home, body='\n'.join(body))
+
+    spec = dict(meta, title=title,
+                figures=[dict(heading=heading, figure=fig.to_plotly_json()) for heading, fig in figures],
+                tables=[dict(caption=caption, **table.to_dict(orient='split')) for caption, table in tables])
+
+    size = _write(os.path.join(folder, f'{filename}.html'), page)
+    size += _write(os.path.join(folder, f'{filename}.json'), pio.json.to_json_plotly(spec))
+    return dict(meta, title=title, html=f'{directory}/{filename}.html', json=f'{directory}/{filename}.json',
+                bytes=size)
+
+
+def render_chunk(output, name, province, quarterly, specs, plotlyjs):
+    """Render the views ``specs`` of one target into ``output``; returns their manifest entries."""
+    directory = target_dir(name, province, quarterly)
+    os.makedirs(os.path.join(output, directory), exist_ok=True)
+    meta = dict(dataset=name, province=province, quarterly=quarterly, model=FORECAST_MODEL)
+
+    if name == 'laju_pertumbuhan':
+        meta['version'] = dataset_version(name, province)
+        return [write_view(output, directory, filename, *render_growth(province), dict(meta, view=kind), plotlyjs)
+                for filename, kind, _ in specs]
+
+    index = get_pivot(name, quarterly=quarterly, province=province)  # loaded once per worker process, then cached
+    meta['version'] = index.version
+    # Fit every entity of the chunk in one batched pass; the views then read the forecast cache
+    selected = {argument for _, kind, argument in specs if kind == 'entitas'}
+    for _, kind, argument in specs:
+        if kind in ('top', 'bottom'):
+            selected.update(index.top(argument) if kind == 'top' else index.bottom(argument))
+    if selected:
+        index.forecast(sorted(selected))
+
+    entries = []
+    for filename, kind, argument in specs:
+        title, figures, tables = render_view(index, kind, argument)
+        entries.append(write_view(output, directory, filename, title, figures, tables,
+                                  dict(meta, view=kind, argument=argument), plotlyjs))
+    return entries
+
+
+def write_index(output, entries):
+    """``index.html`` linking every view, grouped per dataset directory."""
+    sections, current = [], None
+    for entry in entries:
+        directory = entry['html'].rsplit('/', 1)[0]
+        if directory != current:
+            if current is not None:
+                sections.append('</ul>')
+            title = DASHBOARD_TITLES[entry['dataset']]
+            sections.append(f'<h2>{html.escape(title)} ({html.escape(directory)})</h2>\n<ul>')
+            current = directory
+        sections.append(f'<li><a href="{html.escape(entry["html"])}">{html.escape(entry["title"])}</a>'
+                        f' (<a href="{html.escape(entry["json"])}">JSON</a>)</li>')
+    if current is not None:
+        sections.append('</ul>')
+    page = PAGE.format(title='Dashboard PDRB', plotlyjs=PLOTLY_JS, home='index.html', body='\n'.join(sections))
+    # The index has no charts: drop the script tag
+    _write(os.path.join(output, 'index.html'), page.replace(f'<script src="{PLOTLY_JS}"></script>\n', ''))
+
+
+def export(output, names, workers, size=None, all_provinces=False, plotlyjs='directory'):
+    """Render every view of ``names`` into ``output``; returns the manifest entries."""
+    tasks = []
+    for name, province, quarterly in targets(names, all_provinces):
+        specs = view_specs(name, province, quarterly)
+        tasks.extend((name, province, quarterly, chunk)
+                     for chunk in chunks(specs, chunk_size(len(specs), workers, size)))
+
+    os.makedirs(output, exist_ok=True)
+    if plotlyjs == 'directory':
+        from plotly.offline import get_plotlyjs
+        _write(os.path.join(output, PLOTLY_JS), get_plotlyjs())
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render_chunk, output, name, province, quarterly, chunk, plotlyjs)
+                   for name, province, quarterly, chunk in tasks]
+        entries = [entry for future in futures for entry in future.result()]
+
+    write_index(output, entries)
+    _write(os.path.join(output, 'manifest.json'), json.dumps({
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'model': FORECAST_MODEL,
+        'views': entries,
+    }, indent=1, default=str))
+    return entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-render the PDRB dashboard views as static HTML and JSON.")
+    parser.add_argument('output', help="output directory")
+    add_arguments(parser, 'views')
+    parser.add_argument('--all-provinces', action='store_true',
+                        help="render every province (default: the one each dashboard opens with)")
+    parser.add_argument('--plotlyjs', default='directory',
+                        help="'directory' writes plotly.min.js into the output, or a URL to load it from")
+    args = parser.parse_args(argv)
+    use_data_dir(args)
+
+    start = time.perf_counter()
+    entries = export(args.output, args.datasets, args.workers, args.chunk_size, args.all_provinces, args.plotlyjs)
+    print(f"Wrote {len(entries)} views ({sum(e['bytes'] for e in entries) / 2 ** 20:.1f} MB) to {args.output} "
+          f"in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,628 @@
+"""Batched forecasting over a year-by-entity matrix.
+
+Instead of fitting one sklearn ``LinearRegression`` per kabupaten/kota or
+lapangan usaha, every entity is fitted in a single NumPy pass. ``values`` is a
+``(years, entities)`` array; missing observations are ``NaN`` and are simply
+left out of that entity's fit, exactly like filtering the rows beforehand.
+
+``fit_models`` fits the straight line together with log-linear, quadratic and
+damped-trend alternatives in the same batched way and picks one per entity by
+its one-step-ahead forecast error, every candidate scored on forecasts made from
+the earlier periods only (so ``auto`` does at least as well as the straight line
+in the backtest); ``PDRB_FORECAST_MODEL`` fixes a single model instead of ``auto``.
+Closed-form 95% prediction intervals come out of the same sums, and
+``backtest_models`` scores the chosen model of each entity from every
+rolling origin.
+"""
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+FORECAST_HORIZON = 5
+# Fewest observations a model is fitted on in backtests and one-step-ahead errors
+MIN_TRAIN = 3
+FORECAST_MODEL = os.environ.get('PDRB_FORECAST_MODEL', 'auto')
+
+# Two-sided 95% quantiles of Student's t for 1..30 degrees of freedom
+T_QUANTILES = np.array([
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+])
+
+
+def t_quantile(df):
+    """95% two-sided t quantile per entity; NaN without residual degrees of freedom."""
+    df = np.asarray(df, dtype=float)
+    table = T_QUANTILES[np.clip(df, 1, len(T_QUANTILES)).astype(int) - 1]
+    with np.errstate(divide='ignore'):
+        # Past the table the quantile is within 0.01 of 1.96 + 2.4 / df
+        return np.where(df < 1, np.nan, np.where(df > len(T_QUANTILES), 1.96 + 2.4 / df, table))
+
+
+def fit_linear(years, values):
+    """Ordinary least squares slope and intercept for every column of ``values``."""
+    x = np.asarray(years, dtype=float)
+    y = np.asarray(values, dtype=float)
+    if y.ndim == 1:
+        y = y[:, None]
+
+    mask = ~np.isnan(y)
+    y = np.where(mask, y, 0.0)
+    n = mask.sum(axis=0)
+
+    # Center the years so the normal equations stay well conditioned
+    x0 = x.mean()
+    xc = np.where(mask, (x - x0)[:, None], 0.0)
+    sx = xc.sum(axis=0)
+    sy = y.sum(axis=0)
+    sxx = (xc * xc).sum(axis=0)
+    sxy = (xc * y).sum(axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denom = n * sxx - sx * sx
+        slope = np.where(denom != 0, (n * sxy - sx * sy) / denom, 0.0)
+        intercept = (sy - slope * sx) / n - slope * x0
+    return slope, intercept
+
+
+def predict_linear(slope, intercept, years):
+    """Predictions of shape ``(len(years), entities)``."""
+    x = np.asarray(years, dtype=float)[:, None]
+    return intercept[None, :] + slope[None, :] * x
+
+
+def forecast_linear(years, values, horizon=FORECAST_HORIZON, last_year=None):
+    """Fit every entity and project ``horizon`` years past ``last_year``.
+
+    ``last_year`` defaults to the latest year in ``years``. Returns ``(future_years, predictions)`` with ``predictions`` shaped
+    ``(horizon, entities)``.
+    """
+    years = np.asarray(years)
+    slope, intercept = fit_linear(years, values)
+    if last_year is None:
+        last_year = int(years.max())
+    future_years = np.arange(last_year + 1, last_year + horizon + 1)
+    return future_years, predict_linear(slope, intercept, future_years)
+
+
+@dataclass
+class OLSStats:
+    """Running sufficient statistics of a per-entity linear fit.
+
+    Years are measured from a fixed ``origin`` so that appending new years
+    only adds to the sums: ``update`` costs O(new observations) and ``fit``
+    O(entities), without revisiting the history.
+    """
+    origin: float
+    n: np.ndarray
+    sx: np.ndarray
+    sy: np.ndarray
+    sxx: np.ndarray
+    sxy: np.ndarray
+    syy: np.ndarray
+
+    @classmethod
+    def empty(cls, n_entities, origin):
+        zeros = [np.zeros(n_entities) for _ in range(6)]
+        return cls(float(origin), *zeros)
+
+    @classmethod
+    def from_values(cls, years, values, origin=None):
+        years = np.asarray(years, dtype=float)
+        stats = cls.empty(np.shape(values)[1], years.min() if origin is None else origin)
+        return stats.update(years, values)
+
+    def update(self, years, values):
+        """Return the statistics with the ``(years, entities)`` observations added."""
+        y = np.asarray(values, dtype=float)
+        mask = ~np.isnan(y)
+        y = np.where(mask, y, 0.0)
+        x = np.where(mask, (np.asarray(years, dtype=float) - self.origin)[:, None], 0.0)
+        return OLSStats(
+            self.origin,
+            self.n + mask.sum(axis=0),
+            self.sx + x.sum(axis=0),
+            self.sy + y.sum(axis=0),
+            self.sxx + (x * x).sum(axis=0),
+            self.sxy + (x * y).sum(axis=0),
+            self.syy + (y * y).sum(axis=0),
+        )
+
+    @property
+    def sums(self):
+        return self.n, self.sx, self.sy, self.sxx, self.sxy, self.syy
+
+    def take(self, positions):
+        """Statistics of the entities at ``positions``."""
+        return OLSStats(self.origin, *(a[positions] for a in self.sums))
+
+    def pad(self, n_entities):
+        """Statistics extended with empty entries for new entities."""
+        extra = n_entities - len(self.n)
+        return OLSStats(self.origin, *(np.append(a, np.zeros(extra)) for a in self.sums))
+
+    def fit(self):
+        """Slope and intercept (in absolute years) for every entity."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            denom = self.n * self.sxx - self.sx * self.sx
+            slope = np.where(denom != 0, (self.n * self.sxy - self.sx * self.sy) / denom, 0.0)
+            intercept = (self.sy - slope * self.sx) / self.n - slope * self.origin
+        return slope, intercept
+
+    def predict(self, years):
+        """Predictions at ``years`` with their 95% interval, each ``(len(years), entities)``."""
+        slope, intercept = self.fit()
+        prediction = predict_linear(slope, intercept, years)
+        x = np.asarray(years, dtype=float)[:, None] - self.origin
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_x = self.sx / self.n
+            sxx = self.sxx - self.sx * mean_x
+            sxy = self.sxy - self.sy * mean_x
+            sse = np.maximum(self.syy - self.sy * self.sy / self.n - slope * sxy, 0.0)
+            scale = np.sqrt(sse / (self.n - 2))
+            se = scale * np.sqrt(1 + 1 / self.n + (x - mean_x) ** 2 / sxx)
+            half = t_quantile(self.n - 2) * se
+        return prediction, prediction - half, prediction + half
+
+
+@dataclass
+class Backtest:
+    """Rolling-origin (expanding window) forecast errors.
+
+    ``predictions[t, s - 1, e]`` is the forecast of period ``t`` for entity
+    ``e`` made from the periods before ``t - s + 1``, i.e. ``s`` steps ahead.
+    """
+    steps: np.ndarray        # 1..horizon periods ahead
+    mae: np.ndarray          # (steps, entities)
+    mape: np.ndarray         # (steps, entities), percent; zero actuals are left out
+    n_origins: np.ndarray    # (steps, entities) forecasts that could be scored
+    predictions: np.ndarray  # (periods, steps, entities)
+
+
+def backtest_linear(years, values, horizon=FORECAST_HORIZON, min_train=3):
+    """Score linear forecasts from every origin, for every entity, in one pass.
+
+    Each origin is fitted on the periods before it only (no future data in
+    training), from prefix sums of the regression statistics, so all origins
+    and entities are fitted at once. Origins with fewer than ``min_train``
+    observations are skipped.
+    """
+    x = np.asarray(years, dtype=float)
+    y = np.asarray(values, dtype=float)
+    if y.ndim == 1:
+        y = y[:, None]
+    n_periods, n_entities = y.shape
+
+    mask = ~np.isnan(y)
+    y0 = np.where(mask, y, 0.0)
+    # Measure the years from the first one so the prefix sums stay well conditioned
+    xc = x - x[0] if n_periods else x
+    xm = np.where(mask, xc[:, None], 0.0)
+    zero = np.zeros((1, n_entities))
+    # Row ``o``: statistics of the first ``o`` periods, the training window of origin ``o``
+    n, sx, sy, sxx, sxy = (np.concatenate([zero, np.cumsum(a, axis=0)])
+                           for a in (mask.astype(float), xm, y0, xm * xm, xm * y0))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denom = n * sxx - sx * sx
+        usable = (n >= max(min_train, 2)) & (denom > 0)
+        slope = np.where(usable, (n * sxy - sx * sy) / denom, np.nan)
+        intercept = (sy - slope * sx) / n
+
+    steps = np.arange(1, horizon + 1)
+    target = np.arange(n_periods + 1)[:, None] + steps[None, :] - 1      # (origins, steps)
+    in_range = target < n_periods
+    target = np.minimum(target, max(n_periods - 1, 0))
+    pred = intercept[:, None, :] + slope[:, None, :] * xc[target][:, :, None]
+    pred = np.where(in_range[:, :, None], pred, np.nan)
+    return _score(y, pred, steps)
+
+
+def _score(y, pred, steps):
+    """``Backtest`` of the forecasts ``pred[origin, step - 1, entity]`` against the actuals ``y``."""
+    n_periods = len(y)
+    target = np.minimum(np.arange(n_periods + 1)[:, None] + steps[None, :] - 1, max(n_periods - 1, 0))
+    actual = y[target]
+    err = np.abs(pred - actual)
+    scored = ~np.isnan(err)
+    n_origins = scored.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mae = np.where(n_origins > 0, np.where(scored, err, 0.0).sum(axis=0) / n_origins, np.nan)
+        ape = np.where(scored & (actual != 0), err / np.abs(actual), np.nan)
+        n_ape = (~np.isnan(ape)).sum(axis=0)
+        mape = np.where(n_ape > 0, 100 * np.nansum(ape, axis=0) / n_ape, np.nan)
+
+    # Re-index the forecasts by target period
+    origin = np.arange(n_periods)[:, None] - steps[None, :] + 1
+    predictions = pred[np.maximum(origin, 0), steps[None, :] - 1]
+    predictions[origin < 0] = np.nan
+
+    return Backtest(steps=steps, mae=mae, mape=mape, n_origins=n_origins, predictions=predictions)
+
+
+def backtest_models(years, values, models, horizon=FORECAST_HORIZON, min_train=3):
+    """Score the forecasts of ``models[e]`` (one of ``MODELS``) from every origin, per entity.
+
+    The counterpart of ``backtest_linear`` for the model each entity is drawn
+    with; every origin is fitted on the periods before it only. The linear,
+    log-linear and quadratic fits of all origins and entities come from
+    prefix sums of their normal equations in one pass, the damped trend from
+    one recursion over the periods that carries every origin's state.
+    """
+    if all(model == 'linear' for model in models):
+        return backtest_linear(years, values, horizon, min_train)
+    x = np.asarray(years, dtype=float)
+    y = np.asarray(values, dtype=float)
+    if y.ndim == 1:
+        y = y[:, None]
+    n_periods, n_entities = y.shape
+    choice = np.array([MODELS.index(model) for model in models])
+
+    steps = np.arange(1, horizon + 1)
+    pred = np.full((n_periods + 1, horizon, n_entities), np.nan)
+    for name, degree in (('linear', 1), ('log_linear', 1), ('quadratic', 2)):
+        columns = np.flatnonzero(choice == MODELS.index(name))
+        if len(columns):
+            pred[:, :, columns] = _polynomial_forecasts(x, y[:, columns], degree, horizon, min_train,
+                                                        log=name == 'log_linear')
+
+    damped = np.flatnonzero(choice == MODELS.index('damped'))
+    if len(damped):
+        pred[:, :, damped] = _damped_forecasts(x, y[:, damped], horizon, min_train)
+    return _score(y, pred, steps)
+
+
+def _expanding_polyfit(x, y, mask, degree):
+    """Least squares polynomial of every prefix: row ``o`` is fitted on the first ``o`` periods.
+
+    Returns the coefficients ``(periods + 1, entities, degree + 1)`` in powers
+    of ``x`` and the observation count of every prefix ``(periods + 1,
+    entities)``, both from prefix sums of the normal equations.
+    """
+    y0 = np.where(mask, y, 0.0)
+    zero = np.zeros((1, y.shape[1]))
+    powers = [np.where(mask, x[:, None] ** k, 0.0) for k in range(2 * degree + 1)]
+    sums = [np.concatenate([zero, np.cumsum(p, axis=0)]) for p in powers]
+    rhs = np.stack([np.concatenate([zero, np.cumsum(powers[k] * y0, axis=0)]) for k in range(degree + 1)],
+                   axis=-1)
+    normal = np.stack([np.stack([sums[i + j] for j in range(degree + 1)], axis=-1)
+                       for i in range(degree + 1)], axis=-2)
+    # Prefixes with fewer points than coefficients are singular: solved against the identity
+    # instead, their coefficients are not used
+    short = sums[0] < degree + 1
+    normal[short] = np.eye(degree + 1)
+    return np.linalg.solve(normal, rhs[..., None])[..., 0], sums[0]
+
+
+def _polynomial_forecasts(x, y, degree, horizon, min_train, log=False):
+    """``pred[origin, step - 1, entity]`` of the polynomial fitted on the periods before ``origin``.
+
+    With ``log`` the polynomial is fitted to the logarithm of the (positive)
+    values and the forecasts are taken back with ``exp``, as the log-linear
+    model. Origins with fewer than ``min_train`` observations are NaN.
+    """
+    n_periods = len(y)
+    if log:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            y = np.where(y > 0, np.log(np.where(y > 0, y, 1.0)), np.nan)
+    mask = ~np.isnan(y)
+    # Center and scale the years so the quadratic normal equations stay well conditioned
+    x0 = x.mean() if n_periods else 0.0
+    scale = max(x.std(), 1.0) if n_periods else 1.0
+    xs = (x - x0) / scale
+    coef, n = _expanding_polyfit(xs, y, mask, degree)
+
+    target = np.arange(n_periods + 1)[:, None] + np.arange(horizon)[None, :]   # (origins, steps)
+    in_range = target < n_periods
+    xt = xs[np.minimum(target, max(n_periods - 1, 0))] if n_periods else np.zeros(target.shape)
+    pred = sum(coef[:, None, :, k] * xt[:, :, None] ** k for k in range(degree + 1))
+    usable = in_range[:, :, None] & (n >= max(min_train, degree + 1))[:, None, :]
+    pred = np.where(usable, pred, np.nan)
+    return np.exp(pred) if log else pred
+
+
+def _damped_forecasts(x, y, horizon, min_train):
+    """``pred[origin, step - 1, entity]`` of the damped trend fitted on the periods before ``origin``.
+
+    The same fit as ``fit_models`` on every window (started from the
+    window's linear fit, parameters from the grid with the smallest one-step
+    error), run for all origins at once: period ``t`` updates the state of
+    the origins after it, so the window of each origin ends with its own
+    state. Origins with fewer than ``min_train`` observations are NaN.
+    """
+    n_periods, n_entities = y.shape
+    mask = ~np.isnan(y)
+    grid = np.array([(a, b, p) for a in DAMPED_GRID['alpha'] for b in DAMPED_GRID['beta']
+                     for p in DAMPED_GRID['phi']])
+    alpha, beta, phi = (grid[None, :, i, None] for i in range(3))
+
+    # Linear fit of every window from prefix sums, years measured from the first period as OLSStats does
+    stats = OLSStats.empty(n_entities, x[0] if n_periods else 0.0)
+    windows = [stats]
+    for t in range(n_periods):
+        stats = stats.update(x[t:t + 1], y[t:t + 1])
+        windows.append(stats)
+    slope, intercept = (np.stack(a) for a in zip(*(window.fit() for window in windows)))
+    step = np.array([float(np.median(np.diff(x[:origin]))) if origin > 1 else 1.0
+                     for origin in range(n_periods + 1)])[:, None]
+    trend = np.repeat((slope * step)[:, None, :], len(grid), axis=1)
+    level = np.repeat((intercept + slope * (x[0] if n_periods else 0.0))[:, None, :], len(grid), axis=1) - trend
+    sse = np.zeros_like(level)
+
+    for t in range(n_periods):
+        # Origins after t have period t in their window
+        lv, tr = level[t + 1:], trend[t + 1:]
+        forecast = lv + phi * tr
+        observed = mask[t]
+        value = np.where(observed, y[t], forecast)
+        sse[t + 1:] += np.where(observed, (value - forecast) ** 2, 0.0)
+        new_level = np.where(observed, alpha * value + (1 - alpha) * forecast, forecast)
+        trend[t + 1:] = np.where(observed, beta * (new_level - lv) + (1 - beta) * phi * tr, phi * tr)
+        level[t + 1:] = new_level
+
+    best = np.argmin(sse, axis=1)[:, None, :]
+    level = np.take_along_axis(level, best, axis=1)[:, 0]
+    trend = np.take_along_axis(trend, best, axis=1)[:, 0]
+    damping = np.cumsum(grid[:, 2][best[:, 0]][:, None, :] ** np.arange(1, horizon + 1)[None, :, None], axis=1)
+    pred = level[:, None, :] + damping * trend[:, None, :]
+
+    target = np.arange(n_periods + 1)[:, None] + np.arange(horizon)[None, :]
+    n_observed = np.concatenate([np.zeros((1, n_entities)), np.cumsum(mask, axis=0)])
+    origin = np.arange(n_periods + 1)[:, None]
+    usable = (target < n_periods)[:, :, None] & ((n_observed >= min_train) & (origin >= 2))[:, None, :]
+    return np.where(usable, pred, np.nan)
+
+
+# Candidate models of ``fit_models`` and their parameter counts (degrees of freedom of the intervals)
+MODELS = ('linear', 'log_linear', 'quadratic', 'damped')
+N_PARAMS = {'linear': 2, 'log_linear': 2, 'quadratic': 3, 'damped': 5}
+# Holt damped trend: smoothing (alpha, beta) and damping (phi) grid searched per entity
+DAMPED_GRID = {'alpha': (0.2, 0.5, 0.8), 'beta': (0.05, 0.2, 0.5), 'phi': (0.8, 0.9, 0.98)}
+# Fitted parameters of each model: polynomial coefficients in absolute years (log-linear: of the
+# logarithm of the values), and the smoothing parameters and final level and trend of the damped trend
+PARAMETERS = {
+    'linear': ('intercept', 'slope'),
+    'log_linear': ('intercept', 'slope'),
+    'quadratic': ('intercept', 'slope', 'curvature'),
+    'damped': ('alpha', 'beta', 'phi', 'level', 'trend'),
+}
+
+
+@dataclass
+class ModelFit:
+    """Every candidate model fitted to every entity, and the one-step-ahead error choice."""
+    predictions: np.ndarray  # (models, future periods, entities)
+    lower: np.ndarray        # (models, future periods, entities) 95% prediction interval
+    upper: np.ndarray
+    fitted: np.ndarray       # (models, periods, entities) in-sample values
+    one_step_mse: np.ndarray  # (models, entities); inf where a model does not apply
+    choice: np.ndarray       # (entities,) position in MODELS of the selected model
+    params: dict             # model -> (entities, len(PARAMETERS[model]))
+
+    def best(self, array):
+        """``array[model]`` of the selected model of each entity (``predictions``, ``lower``, ...)."""
+        return array[self.choice, :, np.arange(len(self.choice))].T
+
+    @property
+    def models(self):
+        return [MODELS[i] for i in self.choice]
+
+    def parameters(self):
+        """``{parameter: (entities,)}`` of the selected models; NaN where an entity's model has no such parameter."""
+        names = list(dict.fromkeys(name for model in MODELS for name in PARAMETERS[model]))
+        columns = {name: np.full(len(self.choice), np.nan) for name in names}
+        for i, model in enumerate(MODELS):
+            selected = self.choice == i
+            for k, name in enumerate(PARAMETERS[model]):
+                columns[name][selected] = self.params[model][selected, k]
+        return columns
+
+
+def _polyfit(x, y, mask, degree):
+    """Batched NaN-aware least squares polynomial fit.
+
+    Returns the coefficients ``(entities, degree + 1)`` and the inverted
+    normal matrices ``(entities, degree + 1, degree + 1)`` for the intervals.
+    """
+    y0 = np.where(mask, y, 0.0)
+    powers = [mask.astype(float)]
+    for _ in range(2 * degree):
+        powers.append(powers[-1] * x[:, None])
+    sums = [p.sum(axis=0) for p in powers]
+    normal = np.stack([np.stack([sums[i + j] for j in range(degree + 1)], axis=-1)
+                       for i in range(degree + 1)], axis=-2)
+    rhs = np.stack([(powers[i] * y0).sum(axis=0) for i in range(degree + 1)], axis=-1)
+    # pinv keeps entities with too few points finite instead of raising
+    inverse = np.linalg.pinv(normal)
+    return (inverse @ rhs[:, :, None])[:, :, 0], inverse
+
+
+def _polyval(coef, x):
+    return sum(coef[None, :, k] * x[:, None] ** k for k in range(coef.shape[1]))
+
+
+def _damped_trend(y, mask, level0, trend0, horizon):
+    """Holt's damped trend over a parameter grid; best one-step fit per entity.
+
+    Besides the forecasts and in-sample one-step forecasts, returns the
+    factor ``sqrt(1 + sum c_j^2)`` by which the one-step error grows ``h``
+    steps ahead (Hyndman et al., damped additive trend) and the parameters
+    ``(entities, 5)`` in the order of ``PARAMETERS['damped']``.
+    """
+    grid = np.array([(a, b, p) for a in DAMPED_GRID['alpha'] for b in DAMPED_GRID['beta']
+                     for p in DAMPED_GRID['phi']])
+    alpha, beta, phi = (grid[:, i, None] for i in range(3))
+    n_periods, n_entities = y.shape
+    level = np.broadcast_to(level0, (len(grid), n_entities)).copy()
+    trend = np.broadcast_to(trend0, (len(grid), n_entities)).copy()
+    fitted = np.empty((n_periods, len(grid), n_entities))
+    sse = np.zeros((len(grid), n_entities))
+
+    for t in range(n_periods):
+        forecast = level + phi * trend
+        fitted[t] = forecast
+        observed = mask[t]
+        value = np.where(observed, y[t], forecast)
+        sse += np.where(observed, (value - forecast) ** 2, 0.0)
+        new_level = np.where(observed, alpha * value + (1 - alpha) * forecast, forecast)
+        trend = np.where(observed, beta * (new_level - level) + (1 - beta) * phi * trend, phi * trend)
+        level = new_level
+
+    best = np.argmin(sse, axis=0)
+    columns = np.arange(n_entities)
+    steps = np.arange(1, horizon + 1)[:, None]
+    a, b, p = alpha[best, 0][None, :], beta[best, 0][None, :], phi[best, 0][None, :]
+    damping = np.cumsum(p ** steps, axis=0)
+    level, trend = level[best, columns], trend[best, columns]
+    predictions = level[None, :] + damping * trend[None, :]
+    # c_j = alpha * (1 + beta * phi * (1 - phi^j) / (1 - phi)), summed for j = 1..h-1
+    c = a * (1 + b * p * (1 - p ** steps) / (1 - p))
+    previous = np.cumsum(c ** 2, axis=0) - c ** 2
+    growth = np.sqrt(1 + previous)
+    params = np.stack([a[0], b[0], p[0], level, trend], axis=-1)
+    return predictions, fitted[:, best, columns], growth, params
+
+
+def _fit_damped(x, y, mask, slope, intercept, horizon):
+    """``_damped_trend`` started from the linear fit ``(slope, intercept)``, one period before the first one."""
+    step = float(np.median(np.diff(x))) if len(x) > 1 else 1.0
+    trend0 = slope * step
+    level0 = intercept + slope * x[0] - trend0 if len(x) else intercept
+    return _damped_trend(y, mask, level0, trend0, horizon)
+
+
+def _damped_one_step(x, y, mask, min_train):
+    """One-step-ahead forecasts of the damped trend from the earlier periods only, in one pass.
+
+    Started from the linear fit of each entity's first ``min_train``
+    observations; every period is forecast with the grid parameters that had
+    the smallest one-step error before it. NaN until ``min_train`` periods
+    were observed.
+    """
+    n_periods, n_entities = y.shape
+    grid = np.array([(a, b, p) for a in DAMPED_GRID['alpha'] for b in DAMPED_GRID['beta']
+                     for p in DAMPED_GRID['phi']])
+    alpha, beta, phi = (grid[:, i, None] for i in range(3))
+    n_observed = np.cumsum(mask, axis=0)
+    # Period of the min_train-th observation; the start values are fitted up to it
+    start = np.argmax(n_observed >= min_train, axis=0)
+    columns = np.arange(n_entities)
+    stats = OLSStats.from_values(x, np.where(np.arange(n_periods)[:, None] <= start, y, np.nan))
+    slope, intercept = stats.fit()
+    step = float(np.median(np.diff(x))) if n_periods > 1 else 1.0
+    trend = np.broadcast_to(slope * step, (len(grid), n_entities)).copy()
+    level = np.broadcast_to(intercept + slope * (x[0] if n_periods else 0.0), (len(grid), n_entities)) - trend
+    sse = np.zeros((len(grid), n_entities))
+    one_step = np.full((n_periods, n_entities), np.nan)
+
+    for t in range(n_periods):
+        forecast = level + phi * trend
+        one_step[t] = np.where(t > start, forecast[np.argmin(sse, axis=0), columns], np.nan)
+        observed = mask[t]
+        value = np.where(observed, y[t], forecast)
+        sse += np.where(observed & (t > start), (value - forecast) ** 2, 0.0)
+        new_level = np.where(observed, alpha * value + (1 - alpha) * forecast, forecast)
+        trend = np.where(observed, beta * (new_level - level) + (1 - beta) * phi * trend, phi * trend)
+        level = new_level
+    return one_step
+
+
+def fit_models(years, values, future_years, model='auto'):
+    """Fit linear, log-linear, quadratic and damped-trend models to every column of ``values``.
+
+    All models are fitted in batched NumPy over the ``(periods, entities)``
+    matrix. With ``model='auto'`` each entity gets the model with the lowest
+    mean squared one-step-ahead error on the original scale, scored over the
+    periods every model forecasts from at least ``MIN_TRAIN`` earlier
+    observations, otherwise ``model`` for every entity. Log-linear only
+    applies to strictly positive series.
+    """
+    if model != 'auto' and model not in MODELS:
+        raise ValueError(f"Unknown forecast model {model!r}, expected 'auto' or one of {MODELS}")
+    x = np.asarray(years, dtype=float)
+    y = np.asarray(values, dtype=float)
+    if y.ndim == 1:
+        y = y[:, None]
+    future = np.asarray(future_years, dtype=float)
+    mask = ~np.isnan(y)
+    n = mask.sum(axis=0)
+
+    # Center and scale the years so the quadratic normal equations stay well conditioned
+    x0 = x.mean() if len(x) else 0.0
+    scale = max(x.std(), 1.0) if len(x) else 1.0
+    xs, fs = (x - x0) / scale, (future - x0) / scale
+
+    fitted, predictions, lower, upper, params = {}, {}, {}, {}, {}
+    stats = OLSStats.from_values(x, y)
+    slope, intercept = stats.fit()
+    params['linear'] = np.stack([intercept, slope], axis=-1)
+    fitted['linear'] = predict_linear(slope, intercept, x)
+    predictions['linear'], lower['linear'], upper['linear'] = stats.predict(future)
+
+    # Log-linear intervals are symmetric on the log scale
+    positive = np.all(np.where(mask, y, 1.0) > 0, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_stats = OLSStats.from_values(x, np.where(mask & positive, np.log(np.where(mask, y, 1.0)), np.nan))
+        log_slope, log_intercept = log_stats.fit()
+        params['log_linear'] = np.stack([log_intercept, log_slope], axis=-1)
+        fitted['log_linear'] = np.exp(predict_linear(log_slope, log_intercept, x))
+        predictions['log_linear'], lower['log_linear'], upper['log_linear'] = (
+            np.exp(v) for v in log_stats.predict(future))
+
+    coef, inverse = _polyfit(xs, y, mask, 2)
+    fitted['quadratic'] = _polyval(coef, xs)
+    predictions['quadratic'] = _polyval(coef, fs)
+    # Back from the scaled years: c0 + c1 u + c2 u^2 with u = (x - x0) / scale
+    c0, c1, c2 = coef[:, 0], coef[:, 1] / scale, coef[:, 2] / scale ** 2
+    params['quadratic'] = np.stack([c0 - c1 * x0 + c2 * x0 ** 2, c1 - 2 * c2 * x0, c2], axis=-1)
+
+    predictions['damped'], fitted['damped'], growth, params['damped'] = _fit_damped(
+        x, y, mask, slope, intercept, len(future))
+
+    sse = {name: np.where(mask, (fitted[name] - np.where(mask, y, 0.0)) ** 2, 0.0).sum(axis=0)
+           for name in MODELS}
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Quadratic: s * sqrt(1 + f' (X'X)^-1 f) at the future design rows f
+        df = n - N_PARAMS['quadratic']
+        design = fs[:, None] ** np.arange(3)[None, :]
+        leverage = np.einsum('hk,ekl,hl->he', design, inverse, design)
+        half = t_quantile(df) * np.sqrt(sse['quadratic'] / df) * np.sqrt(1 + leverage)
+        lower['quadratic'], upper['quadratic'] = predictions['quadratic'] - half, predictions['quadratic'] + half
+
+        # Damped trend: one-step error scale, widened with the horizon
+        df = n - N_PARAMS['damped']
+        half = t_quantile(df) * np.sqrt(sse['damped'] / df) * growth
+        lower['damped'], upper['damped'] = predictions['damped'] - half, predictions['damped'] + half
+
+    # One-step-ahead errors of every candidate, each forecast made from the earlier periods only
+    one_step = {name: _polynomial_forecasts(x, y, degree, 1, MIN_TRAIN, log=name == 'log_linear')[:-1, 0]
+                for name, degree in (('linear', 1), ('log_linear', 1), ('quadratic', 2))}
+    one_step['damped'] = _damped_one_step(x, y, mask, MIN_TRAIN)
+    # Scored on the same periods for every model: observed, and forecast by all of them
+    scored = mask & ~np.isnan(one_step['linear']) & ~np.isnan(one_step['quadratic']) & ~np.isnan(one_step['damped'])
+    n_scored = scored.sum(axis=0)
+    criterion = []
+    for name in MODELS:
+        with np.errstate(invalid='ignore'):
+            mse = np.where(scored, (one_step[name] - np.where(mask, y, 0.0)) ** 2, 0.0).sum(axis=0) / n_scored
+        if name == 'log_linear':
+            mse = np.where(positive, mse, np.inf)
+        criterion.append(np.where(np.isnan(mse), np.inf, mse))
+    criterion = np.stack(criterion)
+    # Nothing to score yet: keep the straight line
+    choice = np.where(n_scored > 0, np.argmin(criterion, axis=0), 0)
+    if model != 'auto':
+        choice = np.full(y.shape[1], MODELS.index(model))
+
+    return ModelFit(
+        predictions=np.stack([predictions[name] for name in MODELS]),
+        lower=np.stack([lower[name] for name in MODELS]),
+        upper=np.stack([upper[name] for name in MODELS]),
+        fitted=np.stack([fitted[name] for name in MODELS]),
+        one_step_mse=criterion,
+        choice=choice,
+        params=params,
+    )
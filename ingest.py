@@ -0,0 +1,59 @@
+"""Convert the dataset CSVs into typed Arrow snapshots.
+
+    python ingest.py                 # every dataset
+    python ingest.py per_kapita adhb # selected datasets
+    python ingest.py --partition     # also one file per province and year
+    python ingest.py adhb --append pdrb-adhb-2024.csv
+
+``--append`` adds the rows of a CSV with the same columns (new years only) to
+the dataset CSV; running dashboards parse just those rows on their next rerun.
+
+The app memory-maps ``snapshots/<dataset>.arrow`` (inside ``PDRB_DATA_DIR``,
+default the working directory) when it exists and is not older than its CSV,
+and falls back to parsing the CSV otherwise. With ``--partition`` it also
+writes ``partitions/<dataset>/<kode>/<tahun>.arrow``, so a province selected in
+the sidebar is loaded without reading the other provinces.
+"""
+import argparse
+import os
+
+import datasets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build typed Arrow snapshots of the PDRB CSVs.")
+    parser.add_argument('names', nargs='*', metavar='dataset',
+                        help="datasets to convert (default: all of %s)" % ', '.join(datasets.DATASETS))
+    parser.add_argument('--partition', action='store_true', help="also write the per-province store")
+    parser.add_argument('--append', metavar='CSV', help="append the rows of CSV to the one dataset given")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.names) - set(datasets.DATASETS)
+    if unknown:
+        parser.error("unknown dataset(s): %s" % ', '.join(sorted(unknown)))
+
+    if args.append:
+        if len(args.names) != 1:
+            parser.error("--append needs exactly one dataset")
+        name = args.names[0]
+        try:
+            data = datasets.append_csv(name, args.append)
+        except ValueError as exc:
+            parser.error(str(exc))
+        print(f"{name}: {len(data)} rows, version {datasets.dataset_version(name)}")
+        return
+
+    if datasets.feather is None:
+        parser.error("pyarrow is required to write snapshots")
+
+    for name in args.names or datasets.DATASETS:
+        path = datasets.write_snapshot(name)
+        csv_size = os.path.getsize(datasets.csv_path(name))
+        print(f"{name}: {path} ({os.path.getsize(path)} bytes, CSV {csv_size} bytes)")
+        if args.partition:
+            root = datasets.write_partitions(name)
+            print(f"{name}: {root} ({len(datasets.provinces(name))} provinces)")
+
+
+if __name__ == '__main__':
+    main()
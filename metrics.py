@@ -0,0 +1,137 @@
+"""Lightweight per-stage timing for dashboard reruns.
+
+``stage(name)`` times a block of the hot path (CSV read, cleaning, pivoting,
+model fits, figure construction, ``st.plotly_chart``). Stages nest (``load``
+wraps ``csv_read`` and ``pivot``); each records its self time, without the
+stages inside it, so no time is counted twice. Inside ``rerun(label)``
+the timings are collected into a per-rerun breakdown for the debug panel and
+folded into process-wide histograms, which are written in Prometheus text
+format to ``PDRB_METRICS_FILE`` (default ``metrics.prom``; empty disables it).
+``observe_payload`` adds the JSON size of every chart sent to the browser.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Chart payload bucket upper bounds in bytes
+PAYLOAD_BUCKETS = (1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7)
+METRICS_FILE = os.environ.get('PDRB_METRICS_FILE', 'metrics.prom')
+WRITE_INTERVAL = 1.0
+
+_local = threading.local()
+_histograms = {}
+_payload_histograms = {}
+_lock = threading.Lock()
+_last_write = 0.0
+
+
+def _observe(label, name, value, family=_histograms, buckets=BUCKETS):
+    with _lock:
+        hist = family.get((label, name))
+        if hist is None:
+            hist = family[(label, name)] = {'buckets': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                hist['buckets'][i] += 1
+                break
+        hist['sum'] += value
+        hist['count'] += 1
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block as stage ``name`` of the current rerun, minus its nested stages."""
+    # Per thread: time spent in the nested stages of every open stage
+    nested = getattr(_local, 'nested', None)
+    if nested is None:
+        nested = _local.nested = []
+    nested.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        total = time.perf_counter() - start
+        elapsed = total - nested.pop()
+        if nested:
+            nested[-1] += total
+        breakdown = getattr(_local, 'breakdown', None)
+        if breakdown is not None:
+            breakdown[name] = breakdown.get(name, 0.0) + elapsed
+        _observe(getattr(_local, 'label', None) or 'background', name, elapsed)
+
+
+def observe_payload(chart, nbytes):
+    """Record the serialized size of ``chart`` rendered in the current rerun."""
+    _observe(getattr(_local, 'label', None) or 'background', chart, nbytes, _payload_histograms, PAYLOAD_BUCKETS)
+
+
+@contextmanager
+def rerun(label):
+    """Collect the stage timings of one script run of dashboard ``label``."""
+    _local.label = label
+    _local.breakdown = breakdown = {}
+    start = time.perf_counter()
+    try:
+        yield breakdown
+    finally:
+        elapsed = time.perf_counter() - start
+        breakdown['total'] = elapsed
+        _observe(label, 'total', elapsed)
+        _local.label = None
+        _local.breakdown = None
+        write_metrics()
+
+
+def histograms(family=None):
+    family = _histograms if family is None else family
+    with _lock:
+        return {key: {'buckets': list(h['buckets']), 'sum': h['sum'], 'count': h['count']}
+                for key, h in family.items()}
+
+
+def payload_histograms():
+    return histograms(_payload_histograms)
+
+
+def _histogram_lines(metric, help_text, key_label, hists, buckets):
+    lines = [
+        '# HELP %s %s' % (metric, help_text),
+        '# TYPE %s histogram' % metric,
+    ]
+    for (label, name), hist in sorted(hists.items()):
+        labels = 'dashboard="%s",%s="%s"' % (label.replace('"', '\\"'), key_label, name)
+        cumulative = 0
+        for bound, count in zip(buckets, hist['buckets']):
+            cumulative += count
+            lines.append('%s_bucket{%s,le="%g"} %d' % (metric, labels, bound, cumulative))
+        lines.append('%s_bucket{%s,le="+Inf"} %d' % (metric, labels, hist['count']))
+        lines.append('%s_sum{%s} %.6f' % (metric, labels, hist['sum']))
+        lines.append('%s_count{%s} %d' % (metric, labels, hist['count']))
+    return lines
+
+
+def prometheus_text():
+    lines = _histogram_lines('pdrb_stage_seconds', 'Duration of dashboard rerun stages.', 'stage',
+                             histograms(), BUCKETS)
+    lines += _histogram_lines('pdrb_chart_payload_bytes', 'Serialized size of the charts sent to browsers.',
+                              'chart', payload_histograms(), PAYLOAD_BUCKETS)
+    return '\n'.join(lines) + '\n'
+
+
+def write_metrics(path=None, force=False):
+    """Rewrite the metrics file atomically, at most once per ``WRITE_INTERVAL``."""
+    global _last_write
+    path = METRICS_FILE if path is None else path
+    if not path:
+        return
+    now = time.monotonic()
+    if not force and now - _last_write < WRITE_INTERVAL:
+        return
+    _last_write = now
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, path)
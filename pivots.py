@@ -0,0 +1,341 @@
+"""Cached entity-by-year pivots of the datasets.
+
+The dashboards used to filter the long DataFrame once per selected entity and
+rerun ``nlargest``/``nsmallest`` on every rerun. The pivot is built once per
+dataset version instead, with entities as rows and years as columns, plus a
+per-year rank index so series lookups and top/bottom-N selections are O(1).
+
+Per-period aggregates over all entities (mean, median, sum, min, max and,
+where the dataset has population figures, the population-weighted mean) are
+materialized with the pivot, so the "Semua" charts only read a small table.
+
+When a dataset only grew by rows for new years, the cached pivot is patched
+(new columns, ranks of the new years, running regression sums) instead of
+being rebuilt from the whole history. The running sums only give the
+straight line, so forecasts skip the history scan with
+``PDRB_FORECAST_MODEL=linear`` alone; the default per-entity choice
+refits the entity's full series, which costs O(periods) per entity but only
+on forecast cache misses.
+"""
+import threading
+from dataclasses import dataclass, replace
+
+import numpy as np
+import pandas as pd
+
+from caching import forecast_cache
+from datasets import dataset_version, last_append, load_dataset
+from forecast import FORECAST_HORIZON, FORECAST_MODEL, OLSStats, backtest_models, fit_models
+from metrics import stage
+
+# Entity, value and year columns of each long-format dataset
+ENTITY_COLUMNS = {
+    'laju_pertumbuhan': ('Provinsi', 'Laju pertumbuhan Ekonomi', 'tahun'),
+    'per_kapita': ('Nama Kabupaten/Kota', 'Nilai', 'Tahun'),
+    'adhb': ('Lapangan Usaha', 'Nilai PDRB', 'Tahun'),
+}
+# Population column used for the weighted mean, when the CSV provides it
+WEIGHT_COLUMNS = {
+    'per_kapita': 'Penduduk',
+}
+
+
+@dataclass
+class Projection:
+    """Forecasts of one or more entities and their 95% prediction intervals."""
+    years: np.ndarray   # future periods
+    values: np.ndarray  # (periods, entities)
+    lower: np.ndarray
+    upper: np.ndarray
+    models: list        # model of each entity, see forecast.MODELS
+
+
+@dataclass
+class PivotIndex:
+    name: str
+    version: str
+    wide: pd.DataFrame      # entities x periods
+    years: np.ndarray       # ``wide.columns``: integer years, or year + (triwulan - 1) / 4
+    desc_order: np.ndarray  # per period: entity positions by value, largest first
+    asc_order: np.ndarray   # per period: entity positions by value, smallest first
+    valid_counts: np.ndarray
+    stats: OLSStats         # per-entity regression sums over all periods
+    aggregates: pd.DataFrame  # periods x statistics over all entities
+    periods_per_year: int = 1
+
+    @property
+    def dataset(self):
+        """Name of the dataset, without the triwulan and province suffixes of ``name``."""
+        return self.name.partition('@')[0].partition('/')[0]
+
+    @property
+    def entities(self):
+        return self.wide.index
+
+    @property
+    def last_year(self):
+        return int(self.years[-1])
+
+    @property
+    def quarterly(self):
+        return self.periods_per_year == 4
+
+    def recent_mask(self, years_back=1):
+        """Periods within ``years_back`` years of the latest one."""
+        return self.years >= self.years[-1] - years_back
+
+    def series(self, entity):
+        """Historical values of ``entity`` indexed by year, without gaps."""
+        return self.wide.loc[entity].dropna()
+
+    def matrix(self, entities):
+        """Year-by-entity value matrix for the batched forecaster."""
+        return self.wide.loc[entities].to_numpy().T
+
+    def _ranked(self, order, n, year):
+        col = -1 if year is None else self.wide.columns.get_loc(year)
+        positions = order[col, :min(n, self.valid_counts[col])]
+        return self.wide.index[positions].tolist()
+
+    def top(self, n, year=None):
+        """The ``n`` entities with the largest values in ``year`` (default: latest)."""
+        return self._ranked(self.desc_order, n, year)
+
+    def bottom(self, n, year=None):
+        """The ``n`` entities with the smallest values in ``year`` (default: latest)."""
+        return self._ranked(self.asc_order, n, year)
+
+    def future_years(self, horizon=FORECAST_HORIZON):
+        """The ``horizon`` years of periods following the latest one."""
+        steps = np.arange(1, horizon * self.periods_per_year + 1)
+        if self.periods_per_year == 1:
+            return self.last_year + steps
+        return self.years[-1] + steps / self.periods_per_year
+
+    def _fit(self, values, horizon, model):
+        """``(predictions, lower, upper)`` stacked as ``(3, periods, columns)`` and the model names."""
+        with stage('fit'):
+            fit = fit_models(self.years, values, self.future_years(horizon), model)
+            return np.stack([fit.best(fit.predictions), fit.best(fit.lower), fit.best(fit.upper)]), fit.models
+
+    def _fit_entities(self, entities, horizon, model):
+        if model != 'linear':
+            # The other models need every period of the series, see the module docstring
+            return self._fit(self.matrix(entities), horizon, model)
+        # The straight line alone comes from the incrementally maintained sums
+        with stage('fit'):
+            stats = self.stats.take(self.wide.index.get_indexer(entities))
+            return np.stack(stats.predict(self.future_years(horizon))), ['linear'] * len(entities)
+
+    def _cache_key(self, entity, horizon, model='linear'):
+        return (self.name, self.version, entity, horizon, model)
+
+    def forecast(self, entities, horizon=FORECAST_HORIZON, model=FORECAST_MODEL):
+        """Projections of ``entities`` with their 95% prediction intervals.
+
+        ``model`` is one of ``forecast.MODELS`` or ``'auto'`` (lowest
+        one-step-ahead error per entity). Fits are memoized across sessions;
+        only entities missing from the forecast cache are fitted, together in
+        one batched pass.
+        """
+        cached = {}
+        for entity in entities:
+            entry = forecast_cache.get(self._cache_key(entity, horizon, model))
+            if entry is not None:
+                cached[entity] = entry
+
+        missing = [entity for entity in entities if entity not in cached]
+        if missing:
+            fitted, models = self._fit_entities(missing, horizon, model)
+            for i, entity in enumerate(missing):
+                bands = fitted[:, :, i].copy()
+                bands.flags.writeable = False
+                cached[entity] = (bands, models[i])
+                forecast_cache.put(self._cache_key(entity, horizon, model), cached[entity])
+
+        values, lower, upper = np.stack([cached[entity][0] for entity in entities], axis=-1)
+        return Projection(self.future_years(horizon), values, lower, upper,
+                          [cached[entity][1] for entity in entities])
+
+    def forecast_aggregate(self, statistic='mean', horizon=FORECAST_HORIZON, model=FORECAST_MODEL):
+        """Projection of one column of ``aggregates``, memoized across sessions."""
+        def fit():
+            fitted, models = self._fit(self.aggregates[statistic].to_numpy(), horizon, model)
+            fitted.flags.writeable = False
+            return Projection(self.future_years(horizon), *fitted, models)
+
+        return forecast_cache.get_or_compute(self._cache_key(f'<{statistic}>', horizon, model), fit)
+
+    def backtest(self, horizon=FORECAST_HORIZON, model=FORECAST_MODEL):
+        """Rolling-origin errors of the forecast model of every entity up to ``horizon`` years ahead.
+
+        Each entity is scored with the model ``forecast`` draws for it;
+        cached per version and model.
+        """
+        def run():
+            entities = list(self.entities)
+            models = ['linear'] * len(entities) if model == 'linear' else \
+                self._fit_entities(entities, horizon, model)[1]
+            with stage('backtest'):
+                return backtest_models(self.years, self.wide.to_numpy().T, models,
+                                       horizon * self.periods_per_year)
+
+        return forecast_cache.get_or_compute(self._cache_key('<backtest>', horizon, model), run)
+
+    def backtest_aggregate(self, statistic='mean', horizon=FORECAST_HORIZON, model=FORECAST_MODEL):
+        """Rolling-origin errors of the forecast model of one column of ``aggregates``, cached per version."""
+        def run():
+            models = self.forecast_aggregate(statistic, horizon, model).models
+            with stage('backtest'):
+                values = self.aggregates[statistic].to_numpy()
+                return backtest_models(self.years, values, models, horizon * self.periods_per_year)
+
+        return forecast_cache.get_or_compute(self._cache_key(f'<backtest:{statistic}>', horizon, model), run)
+
+    def extend(self, new, version):
+        """Index with the later periods of the pivot ``new`` appended.
+
+        Costs O(new periods x entities): the history, its rank orders and
+        regression sums are reused as they are.
+        """
+        if new.wide.empty:
+            return replace(self, version=version)
+        added = new.wide.index.difference(self.wide.index, sort=False)
+        entities = self.wide.index.append(added)
+        wide = pd.concat([self.wide.reindex(entities), new.wide.reindex(entities)], axis=1)
+        wide.columns.name = self.wide.columns.name
+
+        # Entities that are new have no values in the old periods, so they rank last
+        new_positions = np.tile(np.arange(len(self.wide), len(entities)), (len(self.years), 1))
+        values = wide[new.wide.columns].to_numpy().T
+        desc_order, asc_order, valid_counts = _rank(values)
+
+        return replace(
+            self,
+            version=version,
+            wide=wide,
+            years=np.concatenate([self.years, new.years]),
+            desc_order=np.vstack([np.hstack([self.desc_order, new_positions]), desc_order]),
+            asc_order=np.vstack([np.hstack([self.asc_order, new_positions]), asc_order]),
+            valid_counts=np.concatenate([self.valid_counts, valid_counts]),
+            stats=self.stats.pad(len(entities)).update(new.years, values),
+            aggregates=pd.concat([self.aggregates, new.aggregates]),
+        )
+
+
+def _rank(values):
+    # NaN sorts last in both directions, so the first ``valid_counts`` are real
+    desc_order = np.argsort(-values, axis=1, kind='stable')
+    asc_order = np.argsort(values, axis=1, kind='stable')
+    valid_counts = (~np.isnan(values)).sum(axis=1)
+    return desc_order, asc_order, valid_counts
+
+
+def aggregate_by_year(wide, weights=None):
+    """Statistics over the entities of ``wide`` for every period.
+
+    ``weights`` (same shape as ``wide``) adds ``weighted_mean``, weighting
+    each entity by its weight in that period.
+    """
+    table = pd.DataFrame({
+        'mean': wide.mean(axis=0),
+        'median': wide.median(axis=0),
+        'sum': wide.sum(axis=0, min_count=1),
+        'min': wide.min(axis=0),
+        'max': wide.max(axis=0),
+    })
+    if weights is not None:
+        weights = weights.reindex_like(wide).where(wide.notna())
+        table['weighted_mean'] = (wide * weights).sum(axis=0, min_count=1) / weights.sum(axis=0, min_count=1)
+    return table
+
+
+def build_pivot(data, entity_col, value_col, year_col='Tahun', name='', version='', quarterly=False,
+                weight_col=None):
+    """Pivot the long frame ``data`` into a ``PivotIndex``.
+
+    Datasets with a ``Triwulan`` column hold annual rows (``NA`` triwulan) and
+    quarterly rows; ``quarterly`` picks which of the two is pivoted. Rows that
+    share an entity and period (e.g. several provinces) are summed.
+    ``weight_col`` (if present in ``data``) feeds the weighted mean aggregate.
+    """
+    periods = data[year_col]
+    if 'Triwulan' in data:
+        is_quarter = data['Triwulan'].notna().to_numpy()
+        rows = is_quarter if quarterly else ~is_quarter
+        data = data[rows]
+        periods = data[year_col]
+        if quarterly:
+            periods = periods + (data['Triwulan'].astype('float64') - 1) / 4
+
+    grouped = data.groupby([data[entity_col], periods.rename('Periode')], observed=True, sort=False)
+    wide = grouped[value_col].sum(min_count=1).unstack('Periode')
+    # Keep the entities in file order, like ``unique()`` on the long frame
+    wide = wide.reindex(index=data[entity_col].unique(), columns=sorted(wide.columns))
+    wide.index = wide.index.astype(object)
+    wide.columns.name = year_col
+
+    weights = None
+    if weight_col is not None and weight_col in data:
+        weights = grouped[weight_col].sum(min_count=1).unstack('Periode')
+        weights.index = weights.index.astype(object)
+
+    values = wide.to_numpy().T
+    years = wide.columns.to_numpy(dtype=float if quarterly else int)
+    desc_order, asc_order, valid_counts = _rank(values)
+
+    return PivotIndex(
+        name=name,
+        version=version,
+        wide=wide,
+        years=years,
+        desc_order=desc_order,
+        asc_order=asc_order,
+        valid_counts=valid_counts,
+        stats=OLSStats.from_values(years, values, origin=years.min() if len(years) else 0),
+        aggregates=aggregate_by_year(wide, weights),
+        periods_per_year=4 if quarterly else 1,
+    )
+
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def has_quarters(name, province=None):
+    """Whether dataset ``name`` carries quarterly (triwulan) rows."""
+    data = load_dataset(name, province)
+    return 'Triwulan' in data and bool(data['Triwulan'].notna().any())
+
+
+def get_pivot(name, quarterly=False, province=None):
+    """Pivot index for dataset ``name`` (optionally one province), rebuilt only when the dataset changes."""
+    version = dataset_version(name, province)
+    key = (name, quarterly, province)
+    entry = _cache.get(key)
+    if entry is not None and entry.version == version:
+        return entry
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry is None or entry.version != version:
+            entity_col, value_col, year_col = ENTITY_COLUMNS[name]
+            pivot_name = f'{name}/triwulan' if quarterly else name
+            if province is not None:
+                pivot_name = f'{pivot_name}@{province}'
+            appended = last_append(name) if province is None else None
+            with stage('pivot'):
+                if entry is not None and appended is not None and appended['base_version'] == entry.version:
+                    new = build_pivot(appended['rows'], entity_col, value_col, year_col, pivot_name, version,
+                                      quarterly, WEIGHT_COLUMNS.get(name))
+                    entry = entry.extend(new, version)
+                else:
+                    data = load_dataset(name, province)
+                    entry = build_pivot(data, entity_col, value_col, year_col, pivot_name, version, quarterly,
+                                        WEIGHT_COLUMNS.get(name))
+            _cache[key] = entry
+    return entry
+
+
+def clear_cache():
+    _cache.clear()
@@ -0,0 +1,229 @@
+"""Declarative CSV schemas and the loader they drive.
+
+A ``Schema`` lists the columns a dataset needs: the CSV header, the name in
+the cleaned frame, and a kind that fixes the dtype read from the file and
+the conversion applied while parsing. ``load_csv`` reads only those columns
+(``usecols``) with explicit dtypes, trims the text through the categories
+instead of row by row, parses triwulan labels (``1``-``4``, ``I``-``IV``,
+optionally after ``Triwulan``, ``TW`` or ``Q``) and scales values to the
+dataset's unit.
+
+Files that do not parse with the strict dtypes are read again as text, and
+every row that does not fit the schema (wrong number of fields, missing key,
+a value that is not a number, unknown triwulan or satuan) is left out and
+reported instead of failing the whole load. Columns declared with
+``invalid='missing'`` keep such rows with the value missing; they are
+reported all the same.
+"""
+import logging
+import re
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# dtype read from the CSV per column kind, on the strict (fast) path
+READ_DTYPES = {
+    'code': 'int32',        # kode provinsi; a category in the cleaned frame
+    'text': 'category',     # names, trimmed through their categories
+    'year': 'int16',
+    'quarter': 'category',  # 1-4 or I-IV; empty for annual rows
+    'value': 'float64',     # scaled to the dataset's unit
+    'number': 'float64',    # not a money amount, e.g. jumlah penduduk
+}
+NUMERIC_KINDS = ('code', 'year', 'value', 'number')
+QUARTERS = {'1': 1, '2': 2, '3': 3, '4': 4, 'I': 1, 'II': 2, 'III': 3, 'IV': 4}
+QUARTER_LABEL = re.compile(r'(?:triwulan|tw|q)?[\s.-]*(iv|i{1,3}|[1-4])', re.IGNORECASE)
+REJECTED_COLUMN = 'alasan'
+# Partial chunks combined by ``reduce`` once this many have piled up
+REDUCE_EVERY = 8
+
+
+class SchemaError(ValueError):
+    """The file cannot be read with the schema at all (e.g. a column is missing)."""
+
+
+@dataclass(frozen=True)
+class Column:
+    source: str             # CSV header, compared after trimming
+    name: str               # column name in the cleaned frame
+    kind: str               # one of READ_DTYPES
+    required: bool = True   # rows without a value are rejected
+    optional: bool = False  # the column may be absent from the file
+    # Unparseable values: 'reject' the row, or read them as 'missing' (the row is still reported)
+    invalid: str = 'reject'
+
+
+@dataclass(frozen=True)
+class Schema:
+    columns: tuple
+    delimiter: str = ';'
+    # Unit column and the factor from each accepted unit to the dataset's unit
+    unit_column: str = 'satuan'
+    units: dict = field(default_factory=dict)
+
+    def with_overrides(self, overrides):
+        """The schema with ``{CSV header: {Column field: value}}`` applied, e.g. for one file."""
+        return replace(self, columns=tuple(replace(col, **overrides.get(col.source, {})) for col in self.columns))
+
+
+def parse_quarter(label):
+    """Triwulan 1-4 of ``label``, or -1 when it is not a triwulan label."""
+    match = QUARTER_LABEL.fullmatch(label)
+    return QUARTERS[match.group(1).upper()] if match else -1
+
+
+def _header(source, delimiter):
+    """Header fields of ``source`` (a path or a binary file object), untrimmed."""
+    if hasattr(source, 'readline'):
+        position = source.tell()
+        line = source.readline()
+        source.seek(position)
+    else:
+        with open(source, 'rb') as f:
+            line = f.readline()
+    return [name.strip('"') for name in line.decode('utf-8-sig').rstrip('\r\n').split(delimiter)]
+
+
+def _resolve(schema, header):
+    """``{raw header: Column}`` of the schema columns present in ``header``, plus the unit column."""
+    raw = {name.strip(): name for name in header}
+    columns = {}
+    for col in schema.columns:
+        if col.source in raw:
+            columns[raw[col.source]] = col
+        elif not col.optional:
+            raise SchemaError(f"column {col.source!r} is missing (found {sorted(raw)})")
+    unit = raw.get(schema.unit_column) if schema.units else None
+    return columns, unit
+
+
+def _strip_categories(series):
+    # The mapping runs once per distinct value; blank values become missing
+    trimmed = series.astype('category').map(lambda text: text.strip() or np.nan, na_action='ignore')
+    return trimmed.astype('category')
+
+
+def _convert(chunk, columns, unit, schema, strict):
+    """Converted rows of ``chunk`` that fit the schema, and the reported ones with a reason."""
+    reason = np.full(len(chunk), None, dtype=object)
+    # Rows kept with a value read as missing (invalid='missing')
+    note = np.full(len(chunk), None, dtype=object)
+
+    def reject(mask, text):
+        mask = np.asarray(mask, dtype=bool) & (reason == None)  # noqa: E711
+        reason[mask] = text
+
+    def invalid(col, mask, text):
+        # Required columns cannot keep the row with the value missing
+        if col.invalid == 'reject' or col.required:
+            reject(mask, text)
+        else:
+            mask = np.asarray(mask, dtype=bool) & (note == None)  # noqa: E711
+            note[mask] = f"{text}, dibaca kosong"
+
+    out = {}
+    for raw, col in columns.items():
+        series = chunk[raw]
+        if col.kind in NUMERIC_KINDS and not strict:
+            text = series.str.strip()
+            series = pd.to_numeric(text, errors='coerce')
+            invalid(col, series.isna() & text.notna() & (text != ''), f"{col.source} bukan angka")
+        elif col.kind in ('text', 'quarter'):
+            series = _strip_categories(series)
+            if col.kind == 'quarter':
+                series = series.map(parse_quarter, na_action='ignore').astype(float)
+                invalid(col, series == -1, f"{col.source} tidak dikenal")
+                series = series.where(series != -1)
+        if col.required:
+            reject(series.isna(), f"{col.source} kosong")
+        out[col.name] = series
+
+    if unit is not None:
+        factor = _strip_categories(chunk[unit]).map(schema.units).astype(float)
+        reject(factor.isna(), f"{schema.unit_column} tidak dikenal")
+        for raw, col in columns.items():
+            if col.kind == 'value':
+                out[col.name] = out[col.name] * factor
+
+    bad = reason != None  # noqa: E711
+    reported = bad | (note != None)  # noqa: E711
+    data = pd.DataFrame(out)
+    used = list(dict.fromkeys(list(columns) + ([unit] if unit is not None else [])))
+    rejected = chunk.loc[reported, used].astype(object)
+    rejected[REJECTED_COLUMN] = np.where(bad, reason, note)[reported]
+    data = data.loc[~bad]
+    for col in columns.values():
+        if col.kind in ('code', 'year'):
+            data[col.name] = data[col.name].astype(READ_DTYPES[col.kind])
+        elif col.kind == 'quarter':
+            data[col.name] = data[col.name].astype('Int8')
+    return data.reset_index(drop=True), rejected
+
+
+def _read(source, schema, columns, unit, reduce, chunksize, strict):
+    usecols = list(dict.fromkeys(list(columns) + ([unit] if unit is not None else [])))
+    bad_lines = []
+
+    def skip_line(fields):
+        bad_lines.append(fields)
+
+    if strict:
+        dtype = {raw: READ_DTYPES[col.kind] for raw, col in columns.items()}
+        if unit is not None:
+            dtype[unit] = 'category'
+        options = dict(dtype=dtype, usecols=usecols)
+    else:
+        # Everything as text and every column, so lines with too many fields are caught
+        options = dict(dtype=str, keep_default_na=False, na_values=[''], engine='python',
+                       on_bad_lines=skip_line)
+
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    reader = pd.read_csv(source, delimiter=schema.delimiter, chunksize=chunksize, **options)
+    parts, rejected = [], []
+    for chunk in reader if chunksize else [reader]:
+        data, bad = _convert(chunk, columns, unit, schema, strict)
+        parts.append(data)
+        if len(bad):
+            rejected.append(bad)
+        if reduce is not None and len(parts) >= REDUCE_EVERY:
+            parts = [reduce(parts)]
+
+    if bad_lines:
+        rejected.append(pd.DataFrame({REJECTED_COLUMN: 'jumlah kolom tidak sesuai',
+                                      'baris': [schema.delimiter.join(fields) for fields in bad_lines]}))
+    data = reduce(parts) if reduce is not None else pd.concat(parts, ignore_index=True)
+    for col in columns.values():
+        # Chunks with different categories concatenate to object
+        if col.kind in ('code', 'text'):
+            data[col.name] = data[col.name].astype('category')
+    rejected = pd.concat(rejected, ignore_index=True) if rejected else empty_rejected()
+    return data, rejected
+
+
+def empty_rejected():
+    return pd.DataFrame({REJECTED_COLUMN: pd.Series(dtype=object)})
+
+
+def load_csv(schema, source, reduce=None, chunksize=None):
+    """Read ``source`` with ``schema``; returns ``(data, rejected rows)``.
+
+    The rejected rows are those left out of ``data`` and those kept with a
+    value read as missing, each with its reason in ``alasan``.
+
+    With ``chunksize`` the file is streamed and ``reduce(frames)`` (default
+    ``pd.concat``) combines the converted chunks, e.g. into running totals.
+    Codes and text come back as categories, years ``int16``, triwulan
+    ``Int8`` and values ``float64`` (money amounts in the dataset's unit).
+    """
+    columns, unit = _resolve(schema, _header(source, schema.delimiter))
+    try:
+        return _read(source, schema, columns, unit, reduce, chunksize, strict=True)
+    except (ValueError, pd.errors.ParserError) as exc:
+        logger.warning("Malformed rows in %s (%s), reading it again row by row", source, exc)
+    data, rejected = _read(source, schema, columns, unit, reduce, chunksize, strict=False)
+    logger.warning("Rejected %d row(s) of %s that do not fit the schema", len(rejected), source)
+    return data, rejected
@@ -0,0 +1,31 @@
+"""Start the Streamlit server with the cache warm-up already running.
+
+    python serve.py
+    python serve.py --server.port 8080 --server.headless true
+
+Same as ``streamlit run app.py [options]``, but ``warmup.start()`` is called
+in this process before the server accepts connections, so the caches are
+filled at deploy time instead of on the first visitor's script run. The
+server runs in-process, so the app sees the same module-level caches.
+"""
+import os
+import sys
+
+import warmup
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+
+
+def main(argv=None):
+    # The app shows the warm-up progress in its debug panel when enabled
+    os.environ[warmup.WARMUP_ENV] = '1'
+    warmup.start()
+
+    from streamlit.web import cli
+
+    sys.argv = ['streamlit', 'run', APP] + list(sys.argv[1:] if argv is None else argv)
+    sys.exit(cli.main())
+
+
+if __name__ == '__main__':
+    main()
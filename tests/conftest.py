@@ -0,0 +1,43 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Synthetic datasets with the bundled schemas
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+# No metrics file from the tests (read when metrics is imported)
+os.environ['PDRB_METRICS_FILE'] = ''
+
+import datasets  # noqa: E402
+import pivots  # noqa: E402
+from caching import figure_cache, forecast_cache  # noqa: E402
+
+
+def clear_caches():
+    datasets.clear_cache()
+    pivots.clear_cache()
+    forecast_cache.clear()
+    figure_cache.clear()
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Empty PDRB_DATA_DIR with cold caches."""
+    monkeypatch.setenv(datasets.DATA_DIR_ENV, str(tmp_path))
+    clear_caches()
+    yield tmp_path
+    clear_caches()
+
+
+@pytest.fixture
+def series():
+    """Years and positive values for 4 entities, one starting late and one with a gap."""
+    rng = np.random.default_rng(7)
+    years = np.arange(2005, 2021)
+    values = 100 * np.exp(np.cumsum(rng.normal(0.04, 0.03, size=(len(years), 4)), axis=0))
+    values[:5, 2] = np.nan
+    values[8, 3] = np.nan
+    return years, values
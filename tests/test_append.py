@@ -0,0 +1,103 @@
+"""Appending years to a CSV gives the same pivots and forecasts as a full rebuild."""
+import numpy as np
+import pandas as pd
+import pytest
+import synthetic_data
+
+import datasets
+import pivots
+from conftest import clear_caches
+from forecast import fit_linear
+
+
+def _split_last_year(name, new_path, new_entities=0):
+    """Keep all but the last year in the dataset's CSV and write the last one to ``new_path``."""
+    path = datasets.csv_path(name)
+    data = pd.read_csv(path, sep=';')
+    last = data['tahun'].max()
+    old, new = data[data['tahun'] < last], data[data['tahun'] == last].copy()
+    if new_entities:
+        # Kabupaten/kota that only appear in the appended year
+        extra = new.iloc[:new_entities].copy()
+        extra['bps_nama_kabupaten_kota'] = [f'Kabupaten Baru {i}' for i in range(new_entities)]
+        new = pd.concat([new, extra])
+    old.to_csv(path, sep=';', index=False)
+    new.to_csv(new_path, sep=';', index=False)
+
+
+@pytest.mark.parametrize('name, quarterly, new_entities', [
+    ('per_kapita', False, 3),
+    ('adhb', False, 0),
+    ('adhb', True, 0),
+])
+def test_append_matches_full_rebuild(data_dir, monkeypatch, name, quarterly, new_entities):
+    synthetic_data.generate(str(data_dir), regions=24, years=12, sectors=5, kapita_provinces=2, quarterly=True)
+    new_path = data_dir / 'baru.csv'
+    _split_last_year(name, new_path, new_entities)
+
+    extended = []
+    extend = pivots.PivotIndex.extend
+    monkeypatch.setattr(pivots.PivotIndex, 'extend', lambda self, *args: extended.append(1) or extend(self, *args))
+
+    # Pivot and running sums of the old file, then the append
+    index = pivots.get_pivot(name, quarterly=quarterly)
+    index.forecast(list(index.entities)[:3])
+    datasets.append_csv(name, new_path)
+    incremental = pivots.get_pivot(name, quarterly=quarterly)
+    assert datasets.last_append(name) is not None
+    assert extended
+
+    clear_caches()
+    full = pivots.get_pivot(name, quarterly=quarterly)
+    assert datasets.last_append(name) is None
+
+    # Same entities and periods; the index dtype of the appended names may differ between pandas versions
+    pd.testing.assert_frame_equal(incremental.wide, full.wide, check_index_type=False)
+    np.testing.assert_array_equal(incremental.years, full.years)
+    np.testing.assert_array_equal(incremental.desc_order, full.desc_order)
+    np.testing.assert_array_equal(incremental.asc_order, full.asc_order)
+    pd.testing.assert_frame_equal(incremental.aggregates, full.aggregates)
+
+    entities = list(full.entities)
+    slope, intercept = fit_linear(full.years, full.matrix(entities))
+    np.testing.assert_allclose(incremental.stats.fit(), (slope, intercept))
+
+    a, b = incremental.forecast(entities), full.forecast(entities)
+    assert a.models == b.models
+    for field in ('values', 'lower', 'upper'):
+        np.testing.assert_allclose(getattr(a, field), getattr(b, field))
+
+
+def test_revised_year_reloads_in_full(data_dir):
+    synthetic_data.generate(str(data_dir), regions=24, years=12, kapita_provinces=2)
+    path = datasets.csv_path('per_kapita')
+    data = pd.read_csv(path, sep=';')
+    datasets.load_dataset('per_kapita')
+
+    # Rows for a year the file already has are not an append
+    data[data['tahun'] == data['tahun'].max()].to_csv(path, sep=';', index=False, header=False, mode='a')
+    datasets.load_dataset('per_kapita')
+    assert datasets.last_append('per_kapita') is None
+
+
+def test_linear_forecasts_come_from_the_running_sums(data_dir, monkeypatch):
+    synthetic_data.generate(str(data_dir), regions=24, years=12, kapita_provinces=2)
+    new_path = data_dir / 'baru.csv'
+    _split_last_year('per_kapita', new_path)
+    pivots.get_pivot('per_kapita')
+    datasets.append_csv('per_kapita', new_path)
+    index = pivots.get_pivot('per_kapita')
+    entities = list(index.entities)
+
+    def no_refit(*args, **kwargs):
+        raise AssertionError("fit_models refitted the history")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(pivots, 'fit_models', no_refit)
+        incremental = index.forecast(entities, model='linear')
+
+    clear_caches()
+    full = pivots.get_pivot('per_kapita').forecast(entities, model='linear')
+    assert incremental.models == ['linear'] * len(entities)
+    for field in ('values', 'lower', 'upper'):
+        np.testing.assert_allclose(getattr(incremental, field), getattr(full, field))
@@ -0,0 +1,63 @@
+"""Rolling-origin backtests against plain per-entity refits from every origin."""
+import numpy as np
+
+from forecast import MODELS, backtest_linear, backtest_models, fit_models
+
+HORIZON = 3
+MIN_TRAIN = 3
+
+
+def _refit_loop(years, values, forecast_entity):
+    """``predictions[t, s - 1, e]`` refitting every entity separately on the periods before each origin."""
+    n_periods, n_entities = values.shape
+    predictions = np.full((n_periods, HORIZON, n_entities), np.nan)
+    for origin in range(n_periods):
+        for e in range(n_entities):
+            train = ~np.isnan(values[:origin, e])
+            if train.sum() < MIN_TRAIN:
+                continue
+            target = np.arange(origin, min(origin + HORIZON, n_periods))
+            forecast = forecast_entity(years[:origin], values[:origin, e], years[target], e)
+            for step, t in enumerate(target):
+                predictions[t, step, e] = forecast[step]
+    return predictions
+
+
+def _mae(values, predictions):
+    err = np.abs(predictions - values[:, None, :])
+    return np.nanmean(err, axis=0)
+
+
+def test_backtest_linear_matches_refit_loop(series):
+    years, values = series
+
+    def line(x, y, target, e):
+        observed = ~np.isnan(y)
+        slope, intercept = np.polyfit(x[observed], y[observed], 1)
+        return intercept + slope * target
+
+    expected = _refit_loop(years, values, line)
+    backtest = backtest_linear(years, values, horizon=HORIZON, min_train=MIN_TRAIN)
+    np.testing.assert_allclose(backtest.predictions, expected, rtol=1e-9)
+    np.testing.assert_allclose(backtest.mae, _mae(values, expected), rtol=1e-9)
+
+
+def test_backtest_models_matches_refit_loop(series):
+    years, values = series
+    models = ['quadratic', 'damped', 'log_linear', 'linear']
+
+    def single(x, y, target, e):
+        fit = fit_models(x, y[:, None], target)
+        return fit.predictions[MODELS.index(models[e]), :, 0]
+
+    expected = _refit_loop(years, values, single)
+    backtest = backtest_models(years, values, models, horizon=HORIZON, min_train=MIN_TRAIN)
+    np.testing.assert_allclose(backtest.predictions, expected, rtol=1e-9)
+    np.testing.assert_allclose(backtest.mae, _mae(values, expected), rtol=1e-9)
+
+
+def test_backtest_models_all_linear_is_backtest_linear(series):
+    years, values = series
+    a = backtest_models(years, values, ['linear'] * values.shape[1], horizon=HORIZON)
+    b = backtest_linear(years, values, horizon=HORIZON)
+    np.testing.assert_array_equal(a.predictions, b.predictions)
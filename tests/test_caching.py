@@ -0,0 +1,52 @@
+"""LRU eviction of the process-wide caches and memoized forecasts across sessions."""
+import numpy as np
+import synthetic_data
+
+import pivots
+from caching import LRUCache, forecast_cache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'b' is now the least recently used
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats() == {'entries': 2, 'max_entries': 2, 'hits': 3, 'misses': 1, 'evictions': 1}
+
+
+def test_get_or_compute_computes_once():
+    cache = LRUCache(4)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_compute('key', compute) == 1
+    assert cache.get_or_compute('key', compute) == 1
+    assert len(calls) == 1
+
+
+def test_forecasts_are_fitted_only_for_missing_entities(data_dir, monkeypatch):
+    synthetic_data.generate(str(data_dir), regions=12, years=10, kapita_provinces=1)
+    index = pivots.get_pivot('per_kapita')
+    entities = list(index.entities)
+    first = index.forecast(entities[:3])
+
+    fitted = []
+    fit_entities = index._fit_entities
+
+    def recording(missing, *args):
+        fitted.append(missing)
+        return fit_entities(missing, *args)
+
+    monkeypatch.setattr(index, '_fit_entities', recording)
+    again = index.forecast(entities[:5])
+
+    assert fitted == [entities[3:5]]
+    np.testing.assert_array_equal(again.values[:, :3], first.values)
+    assert len(forecast_cache) == 5
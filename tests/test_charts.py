@@ -0,0 +1,33 @@
+"""Downsampling of the consolidated "Semua" trace."""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from charts import add_entity_traces, downsample_columns
+
+
+def test_quarters_are_averaged_per_year_not_strided():
+    periods = [year + quarter / 4 for year in range(1960, 2020) for quarter in range(4)]
+    wide = pd.DataFrame(np.tile([1.0, 2.0, 3.0, 4.0], (3, 60)), columns=periods)
+    wide.iloc[0, 4] = np.nan
+
+    sampled = downsample_columns(wide, max_points=120)
+    assert sampled.shape == (3, 60)
+    np.testing.assert_allclose(sampled.columns, np.arange(1960, 2020) + 0.375)
+    np.testing.assert_allclose(sampled.iloc[1:].to_numpy(), 2.5)
+    # A missing quarter is left out of its year's mean
+    assert sampled.iloc[0, 1] == 3.0
+
+
+def test_year_buckets_end_at_the_last_year():
+    wide = pd.DataFrame([np.arange(300.0)], columns=np.arange(1700, 2000))
+    sampled = downsample_columns(wide, max_points=120)
+    assert sampled.shape == (1, 100)
+    assert sampled.columns[-1] == 1998.0
+    assert sampled.iloc[0, -1] == 298.0
+
+
+def test_few_entities_keep_every_period():
+    wide = pd.DataFrame(np.ones((2, 200)), columns=np.arange(1800, 2000))
+    fig = add_entity_traces(go.Figure(), wide, max_points=120)
+    assert [len(trace.x) for trace in fig.data] == [200, 200]
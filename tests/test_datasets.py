@@ -0,0 +1,61 @@
+"""The shared dataset cache: reused while the CSV is unchanged, reparsed when its contents change."""
+import os
+
+import pytest
+import synthetic_data
+
+import datasets
+
+
+def _stats():
+    stats = datasets.cache_stats()
+    return stats['hits'], stats['misses'], stats['revalidations']
+
+
+def _touch(path, seconds=10):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 10 ** 9))
+
+
+def test_unchanged_file_is_served_from_the_cache(data_dir):
+    synthetic_data.generate(str(data_dir), regions=12, years=6, kapita_provinces=2)
+    first = datasets.load_dataset('per_kapita')
+    hits, misses, _ = _stats()
+
+    assert datasets.load_dataset('per_kapita') is first
+    assert _stats()[:2] == (hits + 1, misses)
+
+
+def test_touched_file_is_revalidated_without_reparsing(data_dir):
+    synthetic_data.generate(str(data_dir), regions=12, years=6, kapita_provinces=2)
+    first = datasets.load_dataset('per_kapita')
+    version = datasets.dataset_version('per_kapita')
+    _, misses, revalidations = _stats()
+
+    _touch(datasets.csv_path('per_kapita'))
+    assert datasets.load_dataset('per_kapita') is first
+    assert datasets.dataset_version('per_kapita') == version
+    assert _stats()[1:] == (misses, revalidations + 1)
+
+
+def test_changed_file_is_reparsed(data_dir):
+    synthetic_data.generate(str(data_dir), regions=12, years=6, kapita_provinces=2)
+    first = datasets.load_dataset('per_kapita')
+    version = datasets.dataset_version('per_kapita')
+    _, misses, _ = _stats()
+
+    # Same size, one value revised
+    path = datasets.csv_path('per_kapita')
+    with open(path, encoding='utf-8') as f:
+        header, row, *rest = f.read().splitlines(keepends=True)
+    fields = row.split(';')
+    fields[5] = ''.join('1' if c.isdigit() else c for c in fields[5])
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines([header, ';'.join(fields)] + rest)
+    _touch(path)
+
+    reloaded = datasets.load_dataset('per_kapita')
+    assert reloaded is not first
+    assert datasets.dataset_version('per_kapita') != version
+    assert _stats()[1] == misses + 1
+    assert reloaded['Nilai'].iloc[0] == pytest.approx(float(fields[5]))
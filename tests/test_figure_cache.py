@@ -0,0 +1,44 @@
+"""Rendered figures are reused across reruns and rebuilt when the dataset version changes."""
+import os
+
+import synthetic_data
+from streamlit.testing.v1 import AppTest
+
+import datasets
+from caching import figure_cache
+from conftest import ROOT
+
+
+def _open_per_kapita():
+    at = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=60).run()
+    next(s for s in at.sidebar.selectbox if s.label == 'Pilih Dashboard').select('PDRB Per Kapita').run()
+    multiselect = at.sidebar.multiselect[0]
+    multiselect.set_value([multiselect.options[-1]]).run()
+    assert not at.exception
+    return at
+
+
+def test_rerun_reuses_figures_until_the_data_changes(data_dir):
+    synthetic_data.generate(str(data_dir), regions=12, years=8, kapita_provinces=1)
+    at = _open_per_kapita()
+
+    before = figure_cache.stats()
+    at.run()
+    after = figure_cache.stats()
+    assert after['misses'] == before['misses']
+    assert after['hits'] - before['hits'] == len(at.get('plotly_chart'))
+
+    # Revised value: the charts of the new dataset version are built again
+    path = datasets.csv_path('per_kapita')
+    with open(path, encoding='utf-8') as f:
+        header, row, *rest = f.read().splitlines(keepends=True)
+    fields = row.split(';')
+    fields[5] = str(float(fields[5]) + 1)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines([header, ';'.join(fields)] + rest)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    at.run()
+    charts = len(at.get('plotly_chart'))
+    assert figure_cache.stats()['misses'] - after['misses'] == charts
+    assert figure_cache.stats()['entries'] == after['entries'] + charts
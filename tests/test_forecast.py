@@ -0,0 +1,27 @@
+"""Model selection on one-step-ahead errors against plain per-entity refits."""
+import numpy as np
+
+from forecast import MIN_TRAIN, MODELS, fit_models
+
+HORIZON = 3
+
+
+def test_one_step_mse_uses_earlier_periods_only(series):
+    years, values = series
+    fit = fit_models(years, values, years[-1] + np.arange(1, HORIZON + 1))
+    # Scored from the period after each entity's MIN_TRAIN-th observation on
+    observed = ~np.isnan(values)
+    scored = observed & (np.cumsum(observed, axis=0) > MIN_TRAIN)
+    for name, degree in (('linear', 1), ('log_linear', 1), ('quadratic', 2)):
+        errors = [[] for _ in range(values.shape[1])]
+        for t, e in zip(*np.nonzero(scored)):
+            train = observed[:t, e]
+            x, y = years[:t][train], values[:t, e][train]
+            if name == 'log_linear':
+                forecast = np.exp(np.polyval(np.polyfit(x, np.log(y), degree), years[t]))
+            else:
+                forecast = np.polyval(np.polyfit(x, y, degree), years[t])
+            errors[e].append((forecast - values[t, e]) ** 2)
+        expected = [np.mean(err) for err in errors]
+        np.testing.assert_allclose(fit.one_step_mse[MODELS.index(name)], expected, rtol=1e-6)
+    assert np.all(fit.choice == np.argmin(fit.one_step_mse, axis=0))
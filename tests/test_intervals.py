@@ -0,0 +1,39 @@
+"""Closed-form prediction intervals against the textbook formulas."""
+import numpy as np
+
+from forecast import MODELS, OLSStats, fit_models
+
+
+def test_prediction_interval_matches_textbook_ols():
+    rng = np.random.default_rng(3)
+    years = np.arange(2010, 2022)
+    values = 50 + 2.5 * (years - 2010) + rng.normal(0, 3, size=len(years))
+    future = np.arange(2022, 2027)
+
+    # s * t(0.975, n - 2) * sqrt(1 + 1/n + (x0 - mean x)^2 / Sxx)
+    n = len(years)
+    slope, intercept = np.polyfit(years, values, 1)
+    residuals = values - (intercept + slope * years)
+    s = np.sqrt((residuals ** 2).sum() / (n - 2))
+    sxx = ((years - years.mean()) ** 2).sum()
+    t = 2.228  # 10 degrees of freedom
+    half = t * s * np.sqrt(1 + 1 / n + (future - years.mean()) ** 2 / sxx)
+    prediction = intercept + slope * future
+
+    stats_pred, stats_lower, stats_upper = OLSStats.from_values(years, values[:, None]).predict(future)
+    np.testing.assert_allclose(stats_pred[:, 0], prediction)
+    np.testing.assert_allclose(stats_lower[:, 0], prediction - half)
+    np.testing.assert_allclose(stats_upper[:, 0], prediction + half)
+
+    fit = fit_models(years, values, future, 'linear')
+    linear = MODELS.index('linear')
+    np.testing.assert_allclose(fit.lower[linear, :, 0], prediction - half)
+    np.testing.assert_allclose(fit.upper[linear, :, 0], prediction + half)
+
+
+def test_every_model_interval_brackets_its_forecast_and_widens(series):
+    years, values = series
+    fit = fit_models(years, values, years[-1] + np.arange(1, 6))
+    width = fit.upper - fit.lower
+    assert np.all(fit.lower <= fit.predictions) and np.all(fit.predictions <= fit.upper)
+    assert np.all(np.diff(width, axis=1) > 0)
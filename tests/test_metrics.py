@@ -0,0 +1,41 @@
+"""Nested stages record their self time, so a rerun's stages never add up to more than its total."""
+import pytest
+
+import metrics
+from metrics import rerun, stage
+
+
+class FakeClock:
+    """``time.perf_counter`` that only moves when the test sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(metrics.time, 'perf_counter', clock)
+    return clock
+
+
+def test_nested_stages_record_self_time(clock):
+    with rerun('test') as breakdown:
+        with stage('load'):
+            clock.sleep(0.02)
+            with stage('csv_read'):
+                clock.sleep(0.03)
+                with stage('clean'):
+                    clock.sleep(0.01)
+
+    assert breakdown['load'] == pytest.approx(0.02)
+    assert breakdown['csv_read'] == pytest.approx(0.03)
+    assert breakdown['clean'] == pytest.approx(0.01)
+    assert breakdown['total'] == pytest.approx(0.06)
+    assert sum(seconds for name, seconds in breakdown.items() if name != 'total') <= breakdown['total'] + 1e-12
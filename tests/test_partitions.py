@@ -0,0 +1,57 @@
+"""Province partitions: loading one province, and versions that follow the file contents."""
+import pandas as pd
+import pytest
+import synthetic_data
+
+import datasets
+import pivots
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def partitioned(data_dir):
+    synthetic_data.generate(str(data_dir), regions=24, years=8, kapita_provinces=3)
+    datasets.write_partitions('per_kapita')
+    return data_dir
+
+
+def test_province_reads_its_partition(partitioned):
+    full = datasets.load_dataset('per_kapita')
+    datasets.clear_cache()
+
+    assert sorted(datasets.provinces('per_kapita')) == [11, 12, 13]
+    rows = datasets.load_dataset('per_kapita', 12)
+    expected = full[full['Kode Provinsi'] == 12]
+    assert len(rows) == len(expected)
+    assert set(rows['Kode Provinsi']) == {12}
+    # Only the province's files were read, not the CSV
+    assert 'per_kapita' not in datasets.cache_stats()['loaded']
+
+
+def test_same_size_revision_changes_the_version(partitioned):
+    index = pivots.get_pivot('per_kapita', province=11)
+    version = datasets.dataset_version('per_kapita', 11)
+
+    # Revise one value: the fixed-width Arrow files keep their size
+    path = datasets.csv_path('per_kapita')
+    data = pd.read_csv(path, sep=';')
+    first = data.index[data['bps_kode_provinsi'] == 11][0]
+    data.loc[first, 'nilai'] = 999.99
+    data.to_csv(path, sep=';', index=False)
+    datasets.write_partitions('per_kapita')
+
+    assert datasets.load_dataset('per_kapita', 11)['Nilai'].max() == pytest.approx(999.99)
+    assert datasets.dataset_version('per_kapita', 11) != version
+    revised = pivots.get_pivot('per_kapita', province=11)
+    assert revised is not index
+    assert revised.wide.max().max() == pytest.approx(999.99)
+
+
+def test_rewrite_with_same_contents_keeps_the_frame(partitioned):
+    rows = datasets.load_dataset('per_kapita', 11)
+    version = datasets.dataset_version('per_kapita', 11)
+    datasets.write_partitions('per_kapita')
+
+    assert datasets.load_dataset('per_kapita', 11) is rows
+    assert datasets.dataset_version('per_kapita', 11) == version
@@ -0,0 +1,41 @@
+"""Triwulan labels, and the bundled file's counter years read in the chunked pass."""
+import io
+
+import pytest
+
+import datasets
+from schema import load_csv, parse_quarter
+from test_schema import _csv, _reasons
+
+
+@pytest.mark.parametrize('label, quarter', [
+    ('1', 1), ('Triwulan 2', 2), ('triwulan IV', 4), ('TW III', 3), ('TW-1', 1), ('Q3', 3), ('II', 2),
+    ('Triwulan 5', -1), ('Semester 1', -1), ('X', -1),
+])
+def test_parse_quarter(label, quarter):
+    assert parse_quarter(label) == quarter
+
+
+@pytest.mark.parametrize('chunk_rows', [200_000, 3])
+def test_counter_years_of_the_bundled_file_are_annual(data_dir, monkeypatch, chunk_rows):
+    # Counter years are recognised in the streamed pass, also when they span several chunks
+    monkeypatch.setattr(datasets, 'CHUNK_ROWS', chunk_rows)
+    # The bundled file numbers the 2023 sectors 'Triwulan 1'..'Triwulan 6' in the triwulan column
+    rows = [f'11;Aceh;2022;{q};Konstruksi;{q};Miliar Rupiah' for q in (1, 2, 3, 4)]
+    rows += [f'11;Aceh;2023;Triwulan {i};Sektor {i};{i};Miliar Rupiah' for i in range(1, 7)]
+    # A quarterly year labelled another way is still read per triwulan; an unknown label is rejected
+    rows += [f'11;Aceh;2021;TW {q};Konstruksi;{v};Miliar Rupiah' for v, q in enumerate(('I', 'II', 'III', 'IV'))]
+    rows += ['11;Aceh;2021;Triwulan 9;Konstruksi;1;Miliar Rupiah']
+    content = _csv(*rows).getvalue()
+    (data_dir / datasets.DATASETS['adhb']['path']).write_bytes(content)
+
+    data = datasets.load_dataset('adhb')
+    assert _reasons(datasets.rejected_rows('adhb')) == ['triwulan tidak dikenal']
+    assert len(data[data['Tahun'] == 2023]) == 6
+    assert data.loc[data['Tahun'] == 2023, 'Triwulan'].isna().all()
+    for year in (2021, 2022):
+        assert sorted(data.loc[data['Tahun'] == year, 'Triwulan'].dropna()) == [1, 2, 3, 4]
+
+    # Any other file: labels past 4 are not triwulan and are rejected
+    _, rejected = load_csv(datasets.ADHB_SCHEMA, io.BytesIO(content))
+    assert _reasons(rejected) == ['triwulan tidak dikenal'] * 3
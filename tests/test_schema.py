@@ -0,0 +1,69 @@
+"""Rows that do not fit a dataset schema are reported, with the reason, instead of failing the load."""
+import io
+
+import pandas as pd
+import pytest
+
+import datasets
+from schema import REJECTED_COLUMN, Column, Schema, load_csv
+
+HEADER = 'bps_kode_provinsi;bps_nama_provinsi;tahun;triwulan;lapangan_usaha;pdrb;satuan\n'
+
+
+def _csv(*rows):
+    return io.BytesIO((HEADER + ''.join(row + '\n' for row in rows)).encode())
+
+
+def _reasons(rejected):
+    return sorted(rejected[REJECTED_COLUMN])
+
+
+def test_adhb_rejected_rows_report():
+    source = _csv(
+        '11;Aceh;2022;;Konstruksi;100;Miliar Rupiah',
+        '11;Aceh;2022;Triwulan 2;Konstruksi;25;Miliar Rupiah',
+        '11;Aceh;2022;TW III;Konstruksi;26000;Juta Rupiah',
+        '11;Aceh;2022;2;Pertambangan dan Penggalian;abc;Miliar Rupiah',
+        '11;Aceh;2022;;Real Estat;10;Dolar',
+        '11;Aceh;2022;;Real Estat;10;Miliar Rupiah;lebih',
+        '11;Aceh;2022;Triwulan 7;Jasa Lainnya;5;Miliar Rupiah',
+        '11;Aceh;;;Jasa Lainnya;5;Miliar Rupiah',
+    )
+    data, rejected = load_csv(datasets.ADHB_SCHEMA, source)
+
+    assert data['Triwulan'].tolist() == [pd.NA, 2, 3]
+    assert data['Nilai PDRB'].tolist() == pytest.approx([100, 25, 26])
+    assert _reasons(rejected) == [
+        'jumlah kolom tidak sesuai',
+        'pdrb bukan angka',
+        'satuan tidak dikenal',
+        'tahun kosong',
+        'triwulan tidak dikenal',
+    ]
+
+
+def test_invalid_as_missing_is_kept_and_reported():
+    schema = Schema(columns=(
+        Column('tahun', 'Tahun', 'year'),
+        Column('triwulan', 'Triwulan', 'quarter', required=False, invalid='missing'),
+        Column('pdrb', 'Nilai PDRB', 'value', required=False),
+    ))
+    source = io.BytesIO(b'tahun;triwulan;pdrb\n2022;1;5\n2022;Semester 1;6\n')
+    data, rejected = load_csv(schema, source)
+
+    assert len(data) == 2 and data['Triwulan'].isna().tolist() == [False, True]
+    assert _reasons(rejected) == ['triwulan tidak dikenal, dibaca kosong']
+
+
+def test_fallback_keeps_the_strict_dtypes_and_values():
+    rows = [
+        '11;Aceh ;2021;;Konstruksi;100.5;Miliar Rupiah',
+        '11;Aceh;2022;1;Konstruksi;25;Miliar Rupiah',
+        '11;Aceh;2022;II;Real Estat;26000;Juta Rupiah',
+    ]
+    strict, rejected = load_csv(datasets.ADHB_SCHEMA, _csv(*rows))
+    assert rejected.empty
+
+    fallback, rejected = load_csv(datasets.ADHB_SCHEMA, _csv(*rows, '11;Aceh;2022;;Konstruksi;abc;Miliar Rupiah'))
+    assert _reasons(rejected) == ['pdrb bukan angka']
+    pd.testing.assert_frame_equal(fallback, strict)
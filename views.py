@@ -0,0 +1,263 @@
+"""Figures and tables of the dashboard views, without Streamlit.
+
+``app.py`` wraps these builders in its figure cache and ``st.plotly_chart``;
+``export_static.py`` calls the same ones to pre-render the views as static
+files, so both show exactly the same charts from the same cached datasets,
+pivots and forecasts.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from caching import forecast_cache
+from charts import add_entity_traces, add_interval_band, period_axis
+from forecast import FORECAST_MODEL, backtest_models, fit_models
+from metrics import stage
+from pivots import ENTITY_COLUMNS
+
+# Label statistik agregat "Semua" (kolom PivotIndex.aggregates)
+AGGREGATE_LABELS = {
+    'mean': 'Rata-Rata',
+    'median': 'Median',
+    'sum': 'Jumlah',
+    'min': 'Minimum',
+    'max': 'Maksimum',
+    'weighted_mean': 'Rata-Rata Tertimbang Penduduk',
+}
+
+# Label model prediksi (forecast.MODELS); dipilih per entitas dengan galat prediksi satu langkah ke depan
+MODEL_LABELS = {
+    'linear': 'Linear',
+    'log_linear': 'Log-Linear',
+    'quadratic': 'Kuadratik',
+    'damped': 'Tren Teredam',
+}
+
+# Subject of the charts and the plural name of the entities, per pivoted dataset
+SUBJECTS = {
+    'per_kapita': ('PDRB Perkapita', 'Kabupaten/Kota'),
+    'adhb': ('PDRB ADHB', 'Lapangan Usaha'),
+}
+
+ACCURACY_CAPTION = ('Akurasi prediksi model yang digambar pada grafik dari backtest rolling-origin '
+                    '(setiap titik awal hanya memakai data sebelumnya):')
+
+GROWTH_HOVER = (
+    'Tahun: %{x}<br>'
+    'Laju Pertumbuhan: %{y:.2f}%'
+)
+
+
+def accuracy_table(backtest, names, models, periods_per_year=1, positions=None):
+    """Backtest MAE/MAPE per entity for 1..5 years ahead, one row per name, with the scored model."""
+    columns = {'Model': [MODEL_LABELS[model] for model in models]}
+    positions = slice(None) if positions is None else positions
+    for step in backtest.steps[periods_per_year - 1::periods_per_year]:
+        years_ahead = step // periods_per_year
+        columns[f'MAE {years_ahead} thn'] = backtest.mae[step - 1, positions]
+        columns[f'MAPE {years_ahead} thn (%)'] = backtest.mape[step - 1, positions]
+    return pd.DataFrame(columns, index=names).round(2)
+
+
+@dataclass
+class Growth:
+    """Laju pertumbuhan of one province: its backtest and its projection."""
+    data: pd.DataFrame
+    version: str
+    backtest: object              # forecast.Backtest of the selected model
+    backtest_points: pd.DataFrame  # 1-year-ahead backtest prediction of every year
+    future_years: np.ndarray
+    years: np.ndarray             # last historical years, then the future years
+    values: np.ndarray            # fitted, then projected values
+    model: str
+    lower: np.ndarray             # 95% prediction interval over ``future_years``
+    upper: np.ndarray
+
+
+def growth_forecast(data, version, model=FORECAST_MODEL):
+    """Backtest and projection of the cleaned laju pertumbuhan ``data``, memoized across sessions."""
+    X = np.array(data['tahun']).reshape(-1, 1)
+    y = data['Laju pertumbuhan Ekonomi']
+
+    # Prediksi untuk 2 tahun terakhir + 5 tahun ke depan
+    last_two_years = np.arange(data['tahun'].max() - 2, data['tahun'].max() + 1).reshape(-1, 1)
+    future_years = np.arange(data['tahun'].max() + 1, data['tahun'].max() + 6).reshape(-1, 1)
+
+    # Kunci cache prediksi: (dataset, versi data, entitas, horizon); tipe model ditambahkan per grafik
+    cache_key = ('laju_pertumbuhan', version, data['Provinsi'].iloc[0], len(future_years))
+
+    order = np.argsort(X[:, 0], kind='stable')
+
+    def fit_full():
+        # Linear, log-linear, kuadratik dan tren teredam; model dengan galat satu langkah ke depan terkecil dipakai
+        with stage('fit'):
+            fit = fit_models(X[order, 0], y.to_numpy()[order], future_years.ravel(), model)
+            in_sample = np.isin(X[order, 0], last_two_years)
+            years = np.concatenate([X[order, 0][in_sample], future_years.ravel()])
+            values = np.concatenate([fit.best(fit.fitted)[in_sample, 0], fit.best(fit.predictions)[:, 0]])
+            # Interval prediksi 95% untuk tahun-tahun ke depan
+            band = (fit.best(fit.lower)[:, 0], fit.best(fit.upper)[:, 0])
+            return years, values, fit.models[0], band
+
+    # Prediksi berdasarkan model (2 tahun terakhir + 5 tahun ke depan)
+    years, values, chosen, (lower, upper) = forecast_cache.get_or_compute(cache_key + (model,), fit_full)
+
+    def run_backtest():
+        # Backtest rolling-origin dari model terpilih: setiap titik awal hanya dilatih dengan tahun-tahun sebelumnya
+        with stage('backtest'):
+            return backtest_models(X[order, 0], y.to_numpy()[order], [chosen], horizon=len(future_years))
+
+    backtest = forecast_cache.get_or_compute(cache_key + (model, 'backtest'), run_backtest)
+
+    # Prediksi 1 tahun ke depan dari setiap titik awal
+    backtest_points = pd.DataFrame({
+        'tahun': X[order, 0],
+        'Laju pertumbuhan Ekonomi': backtest.predictions[:, 0, 0]
+    }).dropna()
+    return Growth(data, version, backtest, backtest_points, future_years.ravel(), years, values, chosen,
+                  lower, upper)
+
+
+def _growth_history(fig, data):
+    # Garis untuk data historis
+    fig.add_trace(go.Scatter(
+        x=data['tahun'],
+        y=data['Laju pertumbuhan Ekonomi'],
+        mode='lines+markers',
+        name='Data Historis',
+        line=dict(color='blue'),
+        hovertemplate=GROWTH_HOVER
+    ))
+
+
+def growth_backtest_figure(growth):
+    """Grafik 1: data historis dan prediksi backtest 1 tahun ke depan."""
+    fig1 = go.Figure()
+    _growth_history(fig1, growth.data)
+
+    # Garis untuk prediksi 1 tahun ke depan (backtest)
+    fig1.add_trace(go.Scatter(
+        x=growth.backtest_points['tahun'],
+        y=growth.backtest_points['Laju pertumbuhan Ekonomi'],
+        mode='lines+markers',
+        name=f'Prediksi Backtest (1 Tahun ke Depan, {MODEL_LABELS[growth.model]})',
+        line=dict(color='red'),
+        hovertemplate=GROWTH_HOVER
+    ))
+
+    fig1.update_layout(
+        title="Grafik 1: Data Historis dan Prediksi Backtest Rolling-Origin",
+        xaxis_title="Tahun",
+        yaxis_title="Laju Pertumbuhan (%)",
+        xaxis=dict(tickformat='.0f')
+    )
+    return fig1
+
+
+def growth_forecast_figure(growth):
+    """Grafik 2: data historis dan prediksi dari seluruh data historis, dengan interval 95%."""
+    fig2 = go.Figure()
+    _growth_history(fig2, growth.data)
+
+    # Pita interval prediksi 95% di bawah garis prediksi
+    add_interval_band(fig2, growth.future_years, growth.lower, growth.upper, color='rgba(0, 128, 0, 0.15)')
+
+    # Garis untuk data prediksi (Histori Saja)
+    fig2.add_trace(go.Scatter(
+        x=growth.years,
+        y=growth.values,
+        mode='lines+markers',
+        name=f'Prediksi (Histori Saja, {MODEL_LABELS[growth.model]})',
+        line=dict(color='green'),
+        hovertemplate=GROWTH_HOVER
+    ))
+
+    fig2.update_layout(
+        title="Grafik 2: Data Historis dan Prediksi Berdasarkan Semua data Historis",
+        xaxis_title="Tahun",
+        yaxis_title="Laju Pertumbuhan (%)",
+        xaxis=dict(tickformat='.0f')
+    )
+    return fig2
+
+
+def all_entities_figure(index):
+    """Historical values of every entity of the pivot ``index``, without predictions."""
+    fig_combined = go.Figure()
+
+    # Plot historical data (one WebGL trace above the high-cardinality threshold)
+    add_entity_traces(fig_combined, index.wide, '(Historis)')
+
+    fig_combined.update_layout(xaxis=period_axis(index.periods_per_year))
+    return fig_combined
+
+
+def aggregate_figure(index, statistic, projection):
+    """One aggregate over all entities per period, then its ``projection`` and interval."""
+    # plotly.express is imported on the first aggregate chart only (cold start)
+    import plotly.express as px
+
+    subject, entities = SUBJECTS[index.dataset]
+    entity_col, value_col, _ = ENTITY_COLUMNS[index.dataset]
+    label = AGGREGATE_LABELS[statistic]
+
+    avg_data = index.aggregates[statistic].rename(value_col).reset_index()
+    avg_data[entity_col] = f'{label} Semua {entities}'
+    avg_pred_data = pd.DataFrame({
+        entity_col: f'Prediksi Semua {entities} ({MODEL_LABELS[projection.models[0]]})',
+        'Tahun': projection.years,
+        value_col: projection.values[:, 0]
+    })
+
+    # Combine historical and predicted data
+    avg_combined_data = pd.concat([avg_data, avg_pred_data], ignore_index=True)
+
+    fig_avg = px.line(
+        avg_combined_data,
+        x='Tahun',
+        y=value_col,
+        title=f'{label} {subject} Semua {entities}',
+        labels={'Tahun': 'Tahun', value_col: 'Nilai (Juta)'},
+        markers=True
+    )
+    add_interval_band(fig_avg, projection.years, projection.lower[:, 0], projection.upper[:, 0])
+    fig_avg.update_layout(xaxis=period_axis(index.periods_per_year))
+    return fig_avg
+
+
+def selection_figure(index, entities, projection):
+    """History of the selected ``entities``, then their ``projection`` with 95% intervals."""
+    recent_years = index.recent_mask()
+    fig_combined = go.Figure()
+
+    for i, entity in enumerate(entities):
+        # Plot historical data
+        entity_data = index.series(entity)
+        fig_combined.add_trace(go.Scatter(
+            x=entity_data.index,
+            y=entity_data.values,
+            mode='lines+markers',
+            name=f'{entity} (Historis)'
+        ))
+
+        # Combine the last historical years with the predicted values
+        recent_data = index.wide.loc[entity, recent_years].dropna()
+        field_pred_data = pd.Series(projection.values[:, i], index=projection.years)
+        combined_data_pred = pd.concat([recent_data, field_pred_data])
+
+        # Shaded 95% prediction interval, toggled together with its line
+        add_interval_band(fig_combined, projection.years, projection.lower[:, i], projection.upper[:, i],
+                          legendgroup=f'{entity} (Prediksi)')
+        fig_combined.add_trace(go.Scatter(
+            x=combined_data_pred.index,
+            y=combined_data_pred.values,
+            mode='lines+markers',
+            name=f'{entity} (Prediksi {MODEL_LABELS[projection.models[i]]})',
+            legendgroup=f'{entity} (Prediksi)',
+            line=dict(dash='dash')
+        ))
+
+    fig_combined.update_layout(xaxis=period_axis(index.periods_per_year))
+    return fig_combined
@@ -0,0 +1,145 @@
+"""Cache warm-up when the Streamlit server starts.
+
+``start()`` runs one daemon thread per dataset that fills the process-wide
+caches the way the default views would: cleaned dataset, the laju
+pertumbuhan backtest and projection, pivots (annual and triwulan), the
+aggregate table and its forecasts, the rolling-origin backtests, and the
+forecasts behind "Semua" and the top/bottom 3/5/10 selections. Reruns never
+wait for it; a session that arrives first simply computes what it needs
+itself. ``progress()`` reports what has been done so far.
+
+Start the server with ``serve.py`` so the warm-up begins at deploy time,
+before any session connects. With plain ``streamlit run app.py`` and
+``PDRB_WARMUP=1`` it only starts on the first script run, so a deployment
+has to send one synthetic request (e.g. a readiness probe on ``/``, not
+``/_stcore/health``, which does not run the script) to trigger it.
+
+    python serve.py    # streamlit run app.py, warm-up started first
+    python warmup.py   # run the warm-up in the foreground and print progress
+"""
+import logging
+import os
+import threading
+import time
+
+from caching import forecast_cache
+from datasets import DATASETS, dataset_version, default_province, load_dataset
+from pivots import ENTITY_COLUMNS, get_pivot, has_quarters
+from views import growth_forecast
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ENV = 'PDRB_WARMUP'
+TOP_BOTTOM = (3, 5, 10)
+
+_lock = threading.Lock()
+_threads = []
+_progress = {'steps': 0, 'failed': 0, 'datasets': {}, 'started_at': None, 'finished_at': None}
+
+
+def enabled():
+    return os.environ.get(WARMUP_ENV) == '1'
+
+
+def _step(name, status):
+    with _lock:
+        _progress['datasets'][name] = status
+        _progress['steps'] += 1
+        if all(s in ('selesai', 'gagal') for s in _progress['datasets'].values()):
+            _progress['finished_at'] = time.time()
+
+
+def _warm(name):
+    # Same province as the default view (Aceh when the data has several provinces)
+    province = default_province(name, allow_all=name != 'laju_pertumbuhan')
+    _step(name, 'memuat data')
+    data = load_dataset(name, province)
+    if name == 'laju_pertumbuhan':
+        _step(name, 'prediksi')
+        # Same cache key as dashboard_pertumbuhan_pdrb: backtest and projection of the default model
+        growth_forecast(data, dataset_version(name, province))
+        return
+
+    for quarterly in (False, True) if has_quarters(name, province) else (False,):
+        _step(name, 'pivot triwulan' if quarterly else 'pivot')
+        index = get_pivot(name, quarterly=quarterly, province=province)
+
+        _step(name, 'prediksi agregat')
+        for statistic in index.aggregates.columns:
+            index.forecast_aggregate(statistic)
+            index.backtest_aggregate(statistic)
+
+        _step(name, 'prediksi entitas')
+        index.backtest()
+        if len(index.entities) <= forecast_cache.max_entries // 2:
+            # Every single-entity selection, top/bottom included
+            index.forecast(list(index.entities))
+        else:
+            # Too many entities for the forecast cache: only the ranked selections
+            ranked = {entity for n in TOP_BOTTOM for entity in index.top(n) + index.bottom(n)}
+            index.forecast(sorted(ranked))
+
+
+def _run(name):
+    start = time.perf_counter()
+    try:
+        _warm(name)
+    except Exception:
+        logger.exception("Warm-up of dataset %s failed", name)
+        with _lock:
+            _progress['failed'] += 1
+        _step(name, 'gagal')
+    else:
+        _step(name, 'selesai')
+        logger.info("Warm-up of dataset %s finished in %.2f s", name, time.perf_counter() - start)
+
+
+def start(names=None):
+    """Start the warm-up threads once per process; returns immediately."""
+    with _lock:
+        if _threads:
+            return False
+        _progress['started_at'] = time.time()
+        for name in names or DATASETS:
+            if name not in ENTITY_COLUMNS:
+                continue
+            _progress['datasets'][name] = 'menunggu'
+            thread = threading.Thread(target=_run, args=(name,), name=f'warmup-{name}', daemon=True)
+            _threads.append(thread)
+    for thread in _threads:
+        thread.start()
+    return True
+
+
+def start_if_enabled():
+    """Fallback for ``streamlit run app.py``: start on the first script run with PDRB_WARMUP=1."""
+    if enabled():
+        start()
+
+
+def running():
+    return any(thread.is_alive() for thread in _threads)
+
+
+def progress():
+    """Snapshot of the warm-up state: per-dataset status, steps, elapsed seconds."""
+    with _lock:
+        snapshot = dict(_progress, datasets=dict(_progress['datasets']))
+    if snapshot['started_at'] is not None:
+        end = snapshot['finished_at'] or time.time()
+        snapshot['elapsed'] = round(end - snapshot['started_at'], 2)
+    return snapshot
+
+
+def wait(timeout=None):
+    for thread in list(_threads):
+        thread.join(timeout)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    start()
+    while running():
+        print(progress(), flush=True)
+        time.sleep(0.5)
+    print(progress())